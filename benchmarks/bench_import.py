@@ -0,0 +1,60 @@
+"""Benchmark of the time to import the package, in fresh interpreters.
+
+Reports the median wall time of importing gym alone, brawl_stars_gym (which
+registers the environments) and an environment's game (which happens on its
+first construction). Exits with status 1 when importing brawl_stars_gym takes
+more than max_overhead_ms longer than importing gym, to catch regressions.
+
+Usage:
+    python benchmarks/bench_import.py [runs] [max_overhead_ms]
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+
+STATEMENTS = (
+    ("gym", "import gym.envs.registration"),
+    ("brawl_stars_gym", "import brawl_stars_gym"),
+    ("brawl_stars_gym.try_brawler", "import brawl_stars_gym.try_brawler"),
+)
+
+
+def measure(statement, runs):
+    """Returns the median seconds to run statement in a fresh interpreter,
+    or None when it fails (e.g. a dependency is not installed)."""
+    durations = []
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-c", statement],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        durations.append(time.perf_counter() - started_at)
+        if completed.returncode:
+            return None
+    return statistics.median(durations)
+
+
+def main(runs=10, max_overhead_ms=50):
+    baseline = measure("pass", runs)
+    durations = {}
+    for name, statement in STATEMENTS:
+        duration = measure(statement, runs)
+        durations[name] = duration
+        if duration is None:
+            print("{:<30} failed".format(name))
+        else:
+            print("{:<30} {:8.1f} ms".format(name, (duration - baseline) * 1e3))
+
+    overhead = durations["brawl_stars_gym"] - durations["gym"]
+    print("{:<30} {:8.1f} ms".format("overhead over gym", overhead * 1e3))
+    if overhead * 1e3 > max_overhead_ms:
+        print("Import overhead exceeds {} ms".format(max_overhead_ms))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,86 @@
+"""Benchmark of menu navigation: the wall time and frame grabs of a reset.
+
+Runs the RESET_SCRIPT of TryBrawler on a fake game whose screens change after
+fixed latencies, with the original navigation (poll every
+LDPlayer.SPRITE_POLL_INTERVAL and click at once) and with the Navigator: on its
+first run, once it has learned the latencies and when it lets the screen
+settle before clicking.
+
+The timing of the first reset of "navigator" is its first run; the last one is
+with learned latencies.
+
+Usage:
+    python benchmarks/bench_navigation.py [resets]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from brawl_stars_gym.ldplayer import LDPlayer
+from brawl_stars_gym.navigation import Navigator
+from brawl_stars_gym.try_brawler import TryBrawler
+from tests.fixtures import FakeMenuGame
+
+LATENCIES = {"BUTTON_EXIT": 0.65, "BUTTON_TRY": 0.35}
+
+
+def poll_at_fixed_rate(game, script):
+    """The navigation before Navigator."""
+    for step in script:
+        sprite = game.sprites["SPRITE_" + step.region_name]
+        region = game.regions[step.region_name]
+        while not game._locate_sprite(game.grab_frame(), sprite, region):
+            time.sleep(LDPlayer.SPRITE_POLL_INTERVAL)
+        if step.click:
+            game.input_controller.click_screen_region(region)
+
+
+def measure(name, game, navigate, resets):
+    """Reports the navigate(script) of resets on game."""
+    durations = []
+    grabs = []
+    for _ in range(resets):
+        game.events = []
+        started_at = time.perf_counter()
+        navigate(TryBrawler.RESET_SCRIPT)
+        durations.append(time.perf_counter() - started_at)
+        grabs.append(sum(event == "grab" for event, _ in game.events))
+    print(
+        "{:<24} mean {:6.3f} s first {:6.3f} s last {:6.3f} s {:5.1f} grabs".format(
+            name, np.mean(durations), durations[0], durations[-1], np.mean(grabs)
+        )
+    )
+
+
+def main(resets=5):
+    print(
+        "Transition latencies:",
+        ", ".join("{} {} s".format(*item) for item in LATENCIES.items()),
+    )
+
+    game = FakeMenuGame(LATENCIES)
+    measure(
+        "fixed poll (original)",
+        game,
+        lambda script: poll_at_fixed_rate(game, script),
+        resets,
+    )
+
+    game = FakeMenuGame(LATENCIES)
+    measure(
+        "navigator, first run",
+        game,
+        lambda script: Navigator(game).run("reset", script),
+        resets,
+    )
+
+    for name, click_ahead in (("navigator", True), ("navigator, settle", False)):
+        game = FakeMenuGame(LATENCIES)
+        navigator = Navigator(game, click_ahead=click_ahead)
+        measure(name, game, lambda script: navigator.run("reset", script), resets)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,90 @@
+"""Benchmark of observation extraction at the 900x512 game screen resolution.
+
+Compares the original slice, that every consumer copies into its own contiguous
+array, with writing the observation into the preallocated ObservationBuffer.
+Stacking 4 observations by concatenating the last ones (like gym's FrameStack)
+is compared with the stacked views of the buffer. Extracting the HUD features
+(instead of pixels) is measured on the full frame.
+
+Usage:
+    python benchmarks/bench_observation.py [steps]
+"""
+
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+import numpy as np
+
+from brawl_stars_gym.hud import HudFeatureExtractor
+from brawl_stars_gym.observation import ObservationBuffer
+from brawl_stars_gym.try_brawler import TryBrawler
+
+GAME_SCREEN = (28, 8, 540, 908)  # top, left, bottom, right
+
+
+def slice_and_copy(frame_img):
+    top, left, bottom, right = GAME_SCREEN
+    return np.ascontiguousarray(frame_img[top:bottom, left:right])
+
+
+def measure(name, extract, frames, steps):
+    extract(frames[0])  # warm up
+    tracemalloc.start()
+    started_at = time.perf_counter()
+    for step in range(steps):
+        extract(frames[step % len(frames)])
+    duration = time.perf_counter() - started_at
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        "{:<24} {:8.1f} us/step {:10.1f} MB/s {:10.1f} KB allocated (peak)".format(
+            name,
+            duration / steps * 1e6,
+            steps * 512 * 900 * 3 / duration / 1e6,
+            peak / 1e3,
+        )
+    )
+
+
+def main(steps=1000):
+    frames = [
+        np.random.randint(0, 256, (540, 960, 3), dtype=np.uint8) for _ in range(4)
+    ]
+    top, left, bottom, right = GAME_SCREEN
+    width, height = right - left, bottom - top
+
+    measure("slice + copy", slice_and_copy, frames, steps)
+    for layout, grayscale in (("HWC", False), ("CHW", False), ("CHW", True)):
+        buffer = ObservationBuffer(width, height, layout=layout, grayscale=grayscale)
+
+        def write(frame_img):
+            return buffer.write(frame_img[top:bottom, left:right])
+
+        name = "buffer {}{}".format(layout, " gray" if grayscale else "")
+        measure(name, write, frames, steps)
+
+    last = deque(maxlen=4)
+
+    def copy_and_concatenate(frame_img):
+        last.append(slice_and_copy(frame_img))
+        while len(last) < last.maxlen:
+            last.append(last[-1])
+        return np.stack(last)
+
+    measure("stack 4: concatenate", copy_and_concatenate, frames, steps)
+    buffer = ObservationBuffer(width, height, size=5, stack=4)
+
+    def write_stack(frame_img):
+        return buffer.write(frame_img[top:bottom, left:right])
+
+    measure("stack 4: buffer view", write_stack, frames, steps)
+
+    extractor = HudFeatureExtractor(TryBrawler.HUD_FEATURES)
+    measure("hud features", extractor.extract, frames, steps)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
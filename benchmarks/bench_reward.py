@@ -0,0 +1,192 @@
+"""Benchmark of reward extraction, per backend, on the test fixtures.
+
+Reports for preprocessing (the original pipeline, upscaling before masking and
+masking before upscaling), each OCR backend and the full TryBrawler.reward on
+full-size synthetic frames (noise with a fixture pasted into the reward region)
+the latency distribution per call, the throughput and the accuracy against the
+expected damage per second of the fixtures. Backends that are not available
+(e.g. Tesseract is not installed) are reported as such.
+
+The template backend uses the shipped digit templates; without them it is
+trained on the fixtures themselves, so its accuracy is then optimistic.
+
+Usage:
+    python benchmarks/bench_reward.py [repeats]
+"""
+
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from brawl_stars_gym.digits import DigitReader
+from brawl_stars_gym.replay import Recording, ReplayFrame, replay
+from brawl_stars_gym.reward_cache import RewardCache
+from brawl_stars_gym.text_preprocessor import TextImagePreprocessor
+from brawl_stars_gym.try_brawler import TryBrawler
+from tests.fixtures import damage_per_second_samples
+
+
+def report(name, latencies, results=None, expected=None):
+    latencies = np.asarray(latencies)
+    p50, p95, p99 = np.percentile(latencies, (50, 95, 99)) * 1e6
+    accuracy = ""
+    if results is not None:
+        correct = sum(r == e for r, e in zip(results, expected))
+        accuracy = "{:6.1f} % accurate".format(100 * correct / len(expected))
+    print(
+        "{:<28} p50 {:9.1f} p95 {:9.1f} p99 {:9.1f} us {:10.1f} calls/s {}".format(
+            name, p50, p95, p99, len(latencies) / latencies.sum(), accuracy
+        )
+    )
+
+
+def measure(name, read, inputs, expected=None, repeats=10):
+    """Reports read per input; results of the first repeat are checked."""
+    try:
+        read(inputs[0])  # warm up
+    except Exception as e:
+        print("{:<28} unavailable: {!r}".format(name, e))
+        return
+
+    latencies = []
+    results = []
+    for repeat in range(repeats):
+        for item in inputs:
+            started_at = time.perf_counter()
+            result = read(item)
+            latencies.append(time.perf_counter() - started_at)
+            if not repeat:
+                results.append(result)
+    report(name, latencies, results if expected else None, expected)
+
+
+def measure_batch(name, read_batch, inputs, expected, repeats=10):
+    """Reports read_batch of all inputs, amortized per input."""
+    try:
+        results = read_batch(inputs)
+    except Exception as e:
+        print("{:<28} unavailable: {!r}".format(name, e))
+        return
+
+    latencies = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        read_batch(inputs)
+        latencies += [(time.perf_counter() - started_at) / len(inputs)] * len(inputs)
+    report(name, latencies, results, expected)
+
+
+def original_preprocess(img):
+    """The preprocessing before TextImagePreprocessor, with fresh arrays."""
+    img = cv2.resize(img, (0, 0), fx=5, fy=5)
+    img = cv2.inRange(
+        img,
+        TextImagePreprocessor.TEXT_COLOR_LOWER,
+        TextImagePreprocessor.TEXT_COLOR_UPPER,
+    )
+    img = cv2.bitwise_not(img)
+    return cv2.blur(img, (2, 2))
+
+
+def synthetic_frames(rois):
+    top, left, bottom, right = TryBrawler.TRY_BRAWLER_REGIONS[
+        "REWARD_TRY_DAMAGE_PER_SECOND"
+    ]
+    rng = np.random.default_rng(0)
+    frames = rng.integers(0, 256, (len(rois), 540, 960, 3), dtype=np.uint8)
+    for frame, roi in zip(frames, rois):
+        frame[top:bottom, left:right] = roi
+    return frames
+
+
+def measure_reward(name, frames, expected, repeats, recording_dir, **kwargs):
+    """Reports TryBrawler.reward of a replayed game on full-size frames."""
+    try:
+        game = replay(TryBrawler)(recording=recording_dir, fps=1000, **kwargs)
+    except Exception as e:
+        print("{:<28} unavailable: {!r}".format(name, e))
+        return
+    frames = [ReplayFrame(img, index) for index, img in enumerate(frames)]
+    measure(name, game.reward, frames, expected, repeats)
+
+
+def main(repeats=10):
+    samples = damage_per_second_samples()
+    rois = [roi for roi, _ in samples]
+    expected = [expected for _, expected in samples]
+
+    measure("preprocess original", original_preprocess, rois, repeats=repeats)
+    measure(
+        "preprocess upscale first",
+        lambda roi: TryBrawler._preprocess_text_image(roi, mask_first=False),
+        rois,
+        repeats=repeats,
+    )
+    measure("preprocess", TryBrawler._preprocess_text_image, rois, repeats=repeats)
+
+    reader = DigitReader.default()
+    name = "template"
+    if not reader:
+        name = "template (fixture-trained)"
+        try:
+            reader = DigitReader.from_samples(samples)
+        except ValueError as e:
+            print("{:<28} unavailable: {!r}".format(name, e))
+    if reader:
+        measure(name, reader.read, rois, expected, repeats)
+
+    measure(
+        "tesseract upscale first",
+        lambda roi: TryBrawler._damage_per_second_tesseract(roi, mask_first=False),
+        rois,
+        expected,
+        repeats,
+    )
+    measure(
+        "tesseract", TryBrawler._damage_per_second_tesseract, rois, expected, repeats
+    )
+    measure_batch(
+        "tesseract batch",
+        lambda rois: TryBrawler.damage_per_second_batch(rois, backend="tesseract"),
+        rois,
+        expected,
+        repeats,
+    )
+    measure(
+        "template + fallback", TryBrawler.damage_per_second, rois, expected, repeats
+    )
+
+    cache = RewardCache()
+    measure(
+        "template + fallback, cached",
+        lambda roi: cache.get(roi, TryBrawler.damage_per_second),
+        rois,
+        expected,
+        repeats,
+    )
+
+    recording_dir = Path(tempfile.mkdtemp())
+    try:
+        frames = synthetic_frames(rois)
+        Recording.save(recording_dir, frames, np.arange(len(frames)))
+        for backend in TryBrawler.REWARD_BACKENDS:
+            measure_reward(
+                "reward(frame) " + backend,
+                frames,
+                expected,
+                repeats,
+                recording_dir,
+                reward_backend=backend,
+                reward_cache_size=0,
+            )
+    finally:
+        shutil.rmtree(str(recording_dir))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,103 @@
+"""Benchmark of the full TryBrawler step pipeline on synthetic frames.
+
+Replays a SyntheticRecording (damage numbers rendered at the damage counter,
+on backgrounds cropped from the fixtures) and reports the throughput of
+TryBrawler.reward and of step, and the accuracy of the rewards against the
+known damage, per reward backend. Backends that are not available (e.g.
+Tesseract is not installed) are reported as such.
+
+Without shipped digit templates the template backend uses a reader trained
+on other synthetic frames, which is passed to the game as its digit_reader.
+
+Usage:
+    python benchmarks/bench_step.py [frames]
+"""
+
+import sys
+import time
+
+from brawl_stars_gym.digits import DigitReader
+from brawl_stars_gym.replay import ReplayFrame, replay
+from brawl_stars_gym.synthetic import SyntheticRecording
+from brawl_stars_gym.try_brawler import TryBrawler
+from tests.fixtures import DAMAGE_PER_SECOND_CASES, read_image
+
+FPS = 2
+
+
+def backgrounds():
+    """Fixture regions without text; None (noise) when the fixtures are missing."""
+    images = [
+        read_image(image_filename)
+        for image_filename, expected in DAMAGE_PER_SECOND_CASES
+        if not expected
+    ]
+    images = [image for image in images if image is not None]
+    return images or None
+
+
+def report(name, duration, calls, correct=None):
+    accuracy = ""
+    if correct is not None:
+        accuracy = "{:6.1f} % accurate".format(100 * correct / calls)
+    print(
+        "{:<28} {:9.1f} us/call {:10.1f} calls/s {}".format(
+            name, duration / calls * 1e6, calls / duration, accuracy
+        )
+    )
+
+
+def measure_reward(name, game, recording):
+    started_at = time.perf_counter()
+    correct = 0
+    for index in range(len(recording)):
+        frame = ReplayFrame(recording.frames[index], recording.timestamps[index])
+        correct += game.reward(frame) == recording.damage[index]
+    report(name, time.perf_counter() - started_at, len(recording), correct)
+
+
+def measure_step(name, game, recording):
+    game.reset()
+    started_at = time.perf_counter()
+    correct = 0
+    for _ in range(len(recording)):
+        _, reward, _, info = game.step(game.actions[0])
+        index = int(round(info["next_observation_timestamp"] * FPS))
+        correct += reward == recording.damage[index]
+    report(name, time.perf_counter() - started_at, len(recording), correct)
+
+
+def main(frames=500):
+    recording = SyntheticRecording(frames, backgrounds=backgrounds(), fps=FPS)
+
+    reader = DigitReader.default()
+    if not reader:
+        training = SyntheticRecording(200, fps=FPS, seed=1)
+        top, left, bottom, right = TryBrawler.TRY_BRAWLER_REGIONS[
+            "REWARD_TRY_DAMAGE_PER_SECOND"
+        ]
+        try:
+            reader = DigitReader.from_samples(
+                [(frame[top:bottom, left:right].copy(), d) for frame, d in training]
+            )
+        except ValueError as e:
+            print("{:<28} unavailable: {!r}".format("template", e))
+
+    for backend in TryBrawler.REWARD_BACKENDS:
+        try:
+            game = replay(TryBrawler)(
+                recording=recording,
+                fps=100000,
+                reward_backend=backend,
+                reward_cache_size=0,
+                digit_reader=reader,
+            )
+            measure_reward("reward(frame) " + backend, game, recording)
+            measure_step("step " + backend, game, recording)
+        except Exception as e:
+            # E.g. the template backend falls back to a missing Tesseract
+            print("{:<28} unavailable: {!r}".format(backend, e))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -4,20 +4,31 @@ __author__ = """Research 2 use"""
 __email__ = "research2use@hotmail.com"
 __version__ = "0.1.0"
 
-from game_control.envs.game.game_env import GameEnv
-from gym.envs.registration import register
+from importlib import import_module
 
-from brawl_stars_gym.showdown_solo import ShowdownSolo
-from brawl_stars_gym.try_brawler import TryBrawler
+from gym.envs.registration import register
 
+# Environments are registered by string entry points; the games and their heavy
+# dependencies are imported on first construction (see brawl_stars_gym.envs).
 register(
     id="BrawlStarsTryBrawler-v0",
-    entry_point="game_control.envs.game:GameEnv",
-    kwargs={"game_class": TryBrawler},
+    entry_point="brawl_stars_gym.envs:try_brawler",
 )
 
 register(
     id="BrawlStarsShowdownSolo-v0",
-    entry_point="game_control.envs.game:GameEnv",
-    kwargs={"game_class": ShowdownSolo},
+    entry_point="brawl_stars_gym.envs:showdown_solo",
 )
+
+_LAZY_ATTRIBUTES = {
+    "GameEnv": "game_control.envs.game.game_env",
+    "ShowdownSolo": "brawl_stars_gym.showdown_solo",
+    "TryBrawler": "brawl_stars_gym.try_brawler",
+}
+
+
+def __getattr__(name):
+    """Imports the formerly eagerly imported classes on first access."""
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    return getattr(import_module(_LAZY_ATTRIBUTES[name]), name)
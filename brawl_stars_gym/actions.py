@@ -0,0 +1,94 @@
+import numpy as np
+from game_control.input_controller import KeyboardEvent, KeyboardEvents
+from gym.spaces import MultiDiscrete
+
+"""
+Actions that combine several independent choices (like moving and shooting),
+as a MultiDiscrete action space of the keys that are held.
+
+An action holds the keys of the chosen option of every dimension until the
+next action. Only the transitions are sent: DOWN events for keys that are
+newly held and UP events for keys that are released, so repeating an action
+(e.g. over the frames of frame_skip) sends no events at all.
+
+"""
+
+
+class HeldKeyActions:
+    def __init__(self, dimensions):
+        """
+        Args:
+            dimensions (sequence): (name, options) per dimension of the action,
+                where options is a sequence of (name, keys) with the KeyboardKey's
+                that are held for that option.
+        """
+        self._dimensions = tuple(
+            (name, tuple((option, frozenset(keys)) for option, keys in options))
+            for name, options in dimensions
+        )
+        self.nvec = tuple(len(options) for _, options in self._dimensions)
+        self._held = frozenset()
+
+    @property
+    def space(self):
+        """gym.spaces.MultiDiscrete: Space of the actions."""
+        return MultiDiscrete(self.nvec)
+
+    @property
+    def held(self):
+        """frozenset: KeyboardKey's that are held."""
+        return self._held
+
+    def __len__(self):
+        """Returns the number of distinct actions."""
+        return int(np.prod(self.nvec))
+
+    def names(self, action):
+        """Returns the names of the chosen options of action."""
+        return tuple(
+            options[choice][0] for (_, options), choice in zip(self._dimensions, action)
+        )
+
+    def keys(self, action):
+        """Returns the keys that action holds.
+
+        Raises:
+            ValueError: when action does not choose one option per dimension
+        """
+        if len(action) != len(self._dimensions):
+            raise ValueError("Action has not one choice per dimension", action)
+        keys = frozenset()
+        for (_, options), choice in zip(self._dimensions, action):
+            keys |= options[choice][1]
+        return keys
+
+    def index(self, action):
+        """Returns the index of action among all distinct actions, e.g. to record it."""
+        return int(np.ravel_multi_index(tuple(action), self.nvec))
+
+    def events(self, action):
+        """Holds the keys of action; returns the KeyboardEvent's that make it so.
+
+        Args:
+            action (sequence): Index of the chosen option per dimension.
+
+        Returns:
+            list: UP events of released keys, then DOWN events of newly held keys.
+        """
+        keys = self.keys(action)
+        events = _events(KeyboardEvents.UP, self._held - keys) + _events(
+            KeyboardEvents.DOWN, keys - self._held
+        )
+        self._held = keys
+        return events
+
+    def release(self):
+        """Releases all held keys; returns the UP events that make it so."""
+        events = _events(KeyboardEvents.UP, self._held)
+        self._held = frozenset()
+        return events
+
+
+def _events(event, keys):
+    """Returns KeyboardEvent's of keys, in a fixed order."""
+    return [KeyboardEvent(event, key) for key in sorted(keys, key=lambda k: k.name)]
@@ -1,20 +1,94 @@
 import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
 from pathlib import Path
 
 import cv2
 import numpy as np
 from game_control.input_controller import KeyboardEvent, KeyboardEvents, KeyboardKey
-from game_control.limiter import Limiter
-from game_control.sprite import Sprite
+from gym.spaces import Box, Dict, Discrete
 
+from brawl_stars_gym.actions import HeldKeyActions
+from brawl_stars_gym.capture import FrameCapture
+from brawl_stars_gym.hud import HudFeature, HudFeatureExtractor
 from brawl_stars_gym.ldplayer import LDPlayer
+from brawl_stars_gym.navigation import Navigator
+from brawl_stars_gym.observation import ObservationBuffer
+from brawl_stars_gym.profiler import StepProfiler
+from brawl_stars_gym.scheduler import StepScheduler
+from brawl_stars_gym.sprite_registry import SPRITE_REGISTRY
 
 
 class BrawlStars(LDPlayer):
     BRAWL_STARS_DIR = Path("brawl_stars")
-
-    def __init__(self, ldplayer_executable_filepath, fps=2, **kwargs):
+    # top, left, bottom, right
+    BRAWL_STARS_REGIONS = {
+        "BUTTON_BRAWL_STARS": (103, 315, 185, 384),
+        "BUTTON_BRAWLERS": (301, 28, 337, 92),
+        "BUTTON_BACK": (34, 13, 84, 91),
+        "GAME_SCREEN": (28, 8, 540, 908),
+    }
+    # Estimated for the 960x540 layout, with the camera centred on the brawler
+    HUD_FEATURES = (
+        HudFeature("health", (226, 428, 234, 488), (80, 200, 60), 50, "columns", 1),
+        HudFeature("ammo", (236, 430, 242, 487), (0, 150, 255), 50, "columns", 3),
+        HudFeature("super", (430, 800, 490, 860), (0, 210, 255), 50, "pixels", 1),
+    )
+    OBSERVATION_HUD_MODES = ("only", "dict")
+    # (name, options) per dimension of held_keys actions; (name, keys) per option
+    HELD_KEY_ACTIONS = (
+        (
+            "MOVEMENT",
+            (
+                ("DON'T MOVE", ()),
+                ("MOVE UP", (KeyboardKey.KEY_W,)),
+                ("MOVE LEFT", (KeyboardKey.KEY_A,)),
+                ("MOVE DOWN", (KeyboardKey.KEY_S,)),
+                ("MOVE RIGHT", (KeyboardKey.KEY_D,)),
+                ("MOVE TOP-LEFT", (KeyboardKey.KEY_W, KeyboardKey.KEY_A)),
+                ("MOVE TOP-RIGHT", (KeyboardKey.KEY_W, KeyboardKey.KEY_D)),
+                ("MOVE DOWN-LEFT", (KeyboardKey.KEY_S, KeyboardKey.KEY_A)),
+                ("MOVE DOWN-RIGHT", (KeyboardKey.KEY_S, KeyboardKey.KEY_D)),
+            ),
+        ),
+        (
+            "SHOOTING",
+            (
+                ("DON'T SHOOT", ()),
+                ("SHOOT", (KeyboardKey.KEY_E,)),
+                ("SHOOT SUPER", (KeyboardKey.KEY_F,)),
+            ),
+        ),
+    )
+
+    def __init__(
+        self,
+        ldplayer_executable_filepath,
+        fps=2,
+        auto_fps=False,
+        target_jitter=0.01,
+        max_fps=30,
+        async_reward=False,
+        reward_deadline=None,
+        reward_executor=None,
+        observation_buffer_size=0,
+        observation_layout="HWC",
+        observation_grayscale=False,
+        observation_resolution=None,
+        observation_max_pool=False,
+        observation_stack=1,
+        observation_hud=None,
+        frame_skip=1,
+        recorder=None,
+        profile_window=1000,
+        profile_dump_filepath=None,
+        profile_dump_interval=60.0,
+        capture_thread=False,
+        frame_timeout=None,
+        click_ahead=True,
+        held_keys=False,
+        **kwargs
+    ):
         """
         Args:
             ldplayer_executable_filepath (string): Executable of LDPlayer
@@ -23,12 +97,72 @@ class BrawlStars(LDPlayer):
                 Will not pause when fps is too fast for step to keep up.
                 Requested fps can be an int or a tuple (indicating a random
                 range to choose from, with the top value excluded).
+                Steps are scheduled on fixed deadlines (see StepScheduler), so
+                time spent between steps does not lower the rate.
+            auto_fps (bool): Tune the fps, starting at fps, to the highest that
+                keeps the p95 of the seconds that steps start late within
+                target_jitter; the fps of each step is in info["fps"].
+            target_jitter (float): Only with auto_fps; see above.
+            max_fps (float): Only with auto_fps; highest fps that is tried.
+            async_reward (bool): Determine the reward on a worker thread, so it
+                overlaps with choosing and taking the next action. The reward
+                returned by step() then belongs to the frame of the previous step
+                (see info["reward_timestamp"]), except on the step that is done.
+                When no reward is finished yet, like on the first step of an
+                episode, the reward is 0 and info["reward_timestamp"] is None.
+                info["dropped_rewards"] counts rewards of earlier frames that are
+                superseded by the reward of a later frame and never returned.
+            reward_deadline (float): Only with async_reward; seconds after the start
+                of step() that it waits for the reward of its own frame, before
+                delivering it one step later instead. None never waits.
+            reward_executor (Executor): Executor to determine rewards on, e.g. shared
+                by several instances; implies async_reward. It is not shut down by
+                close(), unlike the one that is created for async_reward.
+            observation_buffer_size (int): When > 0, observations are written into a
+                ring of this many preallocated contiguous arrays owned by the
+                environment; each stays valid for the next size - observation_stack
+                steps. 0 returns views in the frame instead (no copy, not contiguous),
+                unless one of the observation modes below is used; then it is
+                observation_stack + 1.
+            observation_layout (string): "HWC" or "CHW".
+            observation_grayscale (bool): Grayscale observations.
+            observation_resolution (tuple): (width, height) to downscale the
+                observations to; None keeps the resolution of the game screen.
+            observation_max_pool (bool): Observation is the pixelwise maximum of the
+                last two frames.
+            observation_stack (int): Observation is a stack of the last this many
+                observations (see ObservationBuffer), a view in the ring.
+            observation_hud (string): None, or one of OBSERVATION_HUD_MODES to
+                observe the HUD_FEATURES vector: "only" instead of the pixels,
+                "dict" as {"pixels": ..., "hud": ...} (see observation_space).
+            frame_skip (int): Number of frames per step; the action is repeated for
+                each frame and the reward and done are determined on the last one.
+            recorder (EpisodeRecorder): Records every step, e.g. for offline RL;
+                not with observation_hud="dict" (Dict observations).
+            profile_window (int): Number of most recent steps that the per-phase
+                statistics of stats() are over.
+            profile_dump_filepath (string): CSV or JSON file that the statistics are
+                appended to every profile_dump_interval seconds; None does not dump.
+            profile_dump_interval (float): Seconds between dumps of the statistics.
+            capture_thread (bool): Capture frames continuously on a dedicated thread,
+                into preallocated buffers; step() then takes the latest captured frame,
+                and only waits when none was captured since the previous step.
+                Observations that are views in the frame stay valid until the
+                next step has returned.
+            frame_timeout (float): Seconds that step() waits for a frame before it
+                raises a RuntimeError; None waits forever.
+            click_ahead (bool): Navigate menus by clicking as soon as a button is
+                seen; otherwise the screen gets time to settle first (see Navigator).
+            held_keys (bool): Actions are HELD_KEY_ACTIONS (see HeldKeyActions):
+                an index per dimension of the MultiDiscrete action_space, whose keys
+                are held until the next step; only key changes are sent. Otherwise
+                an action is a single KeyboardKey of actions.
         """
         # Need fixed size window for region definitions
         super().__init__(ldplayer_executable_filepath, width=960, height=540, **kwargs)
 
         self._sprites.update(
-            Sprite.discover_sprites(
+            SPRITE_REGISTRY.discover(
                 Path(__file__).parent
                 / self.DATA_DIR
                 / self.BRAWL_STARS_DIR
@@ -36,6 +170,7 @@ class BrawlStars(LDPlayer):
             )
         )
 
+        self._held_keys = HeldKeyActions(self.HELD_KEY_ACTIONS) if held_keys else None
         self._actions = (
             KeyboardKey.KEY_W,
             KeyboardKey.KEY_A,
@@ -46,81 +181,66 @@ class BrawlStars(LDPlayer):
             KeyboardKey.KEY_R,  # Temp nothing
         )
 
-        # self._actions = (
-        #     (
-        #         "MOVEMENT", (
-        #             ("MOVE UP", (KeyboardEvent(KeyboardEvents.DOWN, KeyboardKey.KEY_W)),
-        #             ("MOVE LEFT", (KeyboardEvent(KeyboardEvents.DOWN, KeyboardKey.KEY_A)),
-        #             ("MOVE DOWN", (KeyboardEvent(KeyboardEvents.DOWN, KeyboardKey.KEY_S)),
-        #             ("MOVE RIGHT", (KeyboardEvent(KeyboardEvents.DOWN, KeyboardKey.KEY_D))
-        #         )
-        #     ),
-        #     (
-        #         "SHOOTING", (
-        #             ("SHOOT", (KeyboardEvent(KeyboardEvents.DOWN, KeyboardKey.KEY_E)),
-        #             ("SHOOT SUPER", (KeyboardEvent(KeyboardEvents.DOWN, KeyboardKey.KEY_F)),
-        #             ("DON'T SHOOT", ())
-        #         )
-        #     )
-        # )
-
-        # self._actions = {
-        #     "MOVEMENT": {
-        #         "MOVE UP": [
-        #             KeyboardEvent(KeyboardEvents.DOWN, KeyboardKey.KEY_W)
-        #         ],
-        #         "MOVE LEFT": [
-        #             KeyboardEvent(KeyboardEvents.DOWN, KeyboardKey.KEY_A)
-        #         ],
-        #         "MOVE DOWN": [
-        #             KeyboardEvent(KeyboardEvents.DOWN, KeyboardKey.KEY_S)
-        #         ],
-        #         "MOVE RIGHT": [
-        #             KeyboardEvent(KeyboardEvents.DOWN, KeyboardKey.KEY_D)
-        #         ],
-        #         # "MOVE TOP-LEFT": [
-        #         #     KeyboardEvent(KeyboardEvents.DOWN, KeyboardKey.KEY_W),
-        #         #     KeyboardEvent(KeyboardEvents.DOWN, KeyboardKey.KEY_A)
-        #         # ],
-        #         # "MOVE TOP-RIGHT": [
-        #         #     KeyboardEvent(KeyboardEvents.DOWN, KeyboardKey.KEY_W),
-        #         #     KeyboardEvent(KeyboardEvents.DOWN, KeyboardKey.KEY_D)
-        #         # ],
-        #         # "MOVE DOWN-LEFT": [
-        #         #     KeyboardEvent(KeyboardEvents.DOWN, KeyboardKey.KEY_S),
-        #         #     KeyboardEvent(KeyboardEvents.DOWN, KeyboardKey.KEY_A)
-        #         # ],
-        #         # "MOVE DOWN-RIGHT": [
-        #         #     KeyboardEvent(KeyboardEvents.DOWN, KeyboardKey.KEY_S),
-        #         #     KeyboardEvent(KeyboardEvents.DOWN, KeyboardKey.KEY_D)
-        #         # ],
-        #         "DON'T MOVE": []
-        #     },
-        #     "SHOOTING": {
-        #         "SHOOT": [
-        #             KeyboardEvent(KeyboardEvents.DOWN, KeyboardKey.KEY_E)
-        #         ],
-        #         "SHOOT SUPER": [
-        #             KeyboardEvent(KeyboardEvents.DOWN, KeyboardKey.KEY_F)
-        #         ],
-        #         "DON'T SHOOT": []
-        #     }
-        # }
-
-        # top, left, bottom, right
-        self._regions.update(
-            {
-                "BUTTON_BRAWL_STARS": (103, 315, 185, 384),
-                "BUTTON_BRAWLERS": (301, 28, 337, 92),
-                "BUTTON_BACK": (34, 13, 84, 91),
-                "GAME_SCREEN": (28, 8, 540, 908),
-            }
+        self._regions.update(self.BRAWL_STARS_REGIONS)
+
+        self._limiter = StepScheduler(
+            fps, auto=auto_fps, target_jitter=target_jitter, max_fps=max_fps
+        )
+
+        self._observation_resolution = observation_resolution
+        self._observation_buffer = None
+        if (
+            observation_buffer_size
+            or observation_layout != "HWC"
+            or observation_grayscale
+            or observation_resolution
+            or observation_max_pool
+            or observation_stack > 1
+        ):
+            self._observation_buffer = ObservationBuffer(
+                *self.observation_dimensions(),
+                size=observation_buffer_size or observation_stack + 1,
+                layout=observation_layout,
+                grayscale=observation_grayscale,
+                max_pool=observation_max_pool,
+                stack=observation_stack
+            )
+        if observation_hud not in (None,) + self.OBSERVATION_HUD_MODES:
+            raise ValueError("Unknown HUD observation mode", observation_hud)
+        if recorder is not None and observation_hud == "dict":
+            raise ValueError("Can not record Dict observations", observation_hud)
+        self._observation_hud = observation_hud
+        self._hud = HudFeatureExtractor(self.HUD_FEATURES) if observation_hud else None
+        self._frame_skip = frame_skip
+        self._recorder = recorder
+        self._profiler = StepProfiler(
+            window=profile_window,
+            dump_filepath=profile_dump_filepath,
+            dump_interval=profile_dump_interval,
         )
 
-        self._limiter = Limiter(fps=fps)
+        self._reward_deadline = reward_deadline
+        self._owns_reward_executor = reward_executor is None and async_reward
+        if self._owns_reward_executor:
+            reward_executor = ThreadPoolExecutor(max_workers=1)
+        self._reward_executor = reward_executor
+        self._pending_reward = None
+
+        self._frame_timeout = frame_timeout
+        self._frame_capture = None
+        self._navigator = Navigator(self, click_ahead=click_ahead)
 
         self.start_app()
 
+        if capture_thread:
+            # Buffers that must not be overwritten while a step captures: its
+            # frame_skip frames, the frames that asynchronous rewards may still
+            # read (of this and the previous step) and the frame of the previous
+            # step, that the returned (view) observation is in
+            pending_rewards = 0 if self._reward_executor is None else 2
+            hold = self._frame_skip + pending_rewards + 1
+            self._frame_capture = FrameCapture(self.grab_frame, hold=hold)
+
     def start_app(self):
         """Starts Brawl Stars app in LDPlayer; returns when it is started.
 
@@ -132,23 +252,64 @@ class BrawlStars(LDPlayer):
         """
         sprite = self.sprites["SPRITE_BUTTON_BRAWL_STARS"]
         region = self.regions["BUTTON_BRAWL_STARS"]
-        found, frame, _ = self._wait_for_sprite(
-            sprite, region=region, msg="Waiting for LDPlayer ..."
+        brawlers_sprite = self.sprites["SPRITE_BUTTON_BRAWLERS"]
+        brawlers_region = self.regions["BUTTON_BRAWLERS"]
+
+        # Brawl Stars may already run, then it is not started (again)
+        found, frame, _ = self._wait_for_sprites(
+            [(sprite, region), (brawlers_sprite, brawlers_region)],
+            msg="Waiting for LDPlayer ...",
         )
         if not found:
             raise RuntimeError("Could not find sprite", sprite.name, "in time")
+        if found is brawlers_sprite:
+            return frame
         self.input_controller.click_screen_region(region)
 
-        sprite = self.sprites["SPRITE_BUTTON_BRAWLERS"]
-        region = self.regions["BUTTON_BRAWLERS"]
-        found, frame, _ = self._wait_for_sprite(
-            sprite, region=region, msg="Waiting for Brawl Stars ..."
+        sprite = brawlers_sprite
+        region = brawlers_region
+        found, frame, _ = self._wait_for_sprites(
+            [(sprite, region)], msg="Waiting for Brawl Stars ..."
         )
         if not found:
             raise RuntimeError("Could not find sprite", sprite.name, "in time")
 
         return frame
 
+    def _navigate(self, name, script):
+        """Runs navigation script (of NavigationStep's) through the menus.
+
+        Returns:
+            Frame: Frame in which the sprite of the last step was found.
+
+        Raises:
+            RuntimeError: when a sprite could not be found in time
+        """
+        if self._frame_capture is None:
+            return self._navigator.run(name, script)
+
+        # The navigator grabs frames itself
+        self._frame_capture.pause()
+        try:
+            return self._navigator.run(name, script)
+        finally:
+            self._frame_capture.resume()
+
+    def close(self):
+        """Stops the capture thread and the reward worker that this game created.
+
+        Later steps grab their frames directly; with async_reward they can not
+        determine rewards anymore.
+        """
+        if self._frame_capture is not None:
+            self._frame_capture.stop()
+            self._frame_capture = None
+        if self._owns_reward_executor:
+            if self._pending_reward is not None:
+                self._pending_reward[1].cancel()
+                self._pending_reward = None
+            self._reward_executor.shutdown()
+
     def stop_app(self):
         """Stops Brawl Stars app; returns when in main screen of LDPlayer.
 
@@ -162,29 +323,78 @@ class BrawlStars(LDPlayer):
         """Calculate the dimensions of region of interest that is analysed.
 
         Returns:
-            tuple: (width, height) of region of interest of actual game.
+            tuple: (width, height) of region of interest of actual game,
+                or the requested observation_resolution.
         """
+        if self._observation_resolution:
+            return tuple(self._observation_resolution)
         (top, left, bottom, right) = self.regions["GAME_SCREEN"]
         width = right - left
         height = bottom - top
         return (width, height)
 
+    @property
+    def observation_shape(self):
+        """tuple: Shape of the pixel observations that are returned by observation()."""
+        if self._observation_buffer is not None:
+            return self._observation_buffer.shape
+        width, height = self.observation_dimensions()
+        return (height, width, 3)
+
+    @property
+    def observation_space(self):
+        """gym.spaces.Space: Space of the observations returned by observation().
+
+        A Box of pixels, a Box of HUD features with observation_hud="only" or a
+        Dict of both ("pixels" and "hud") with observation_hud="dict".
+        """
+        pixels = Box(low=0, high=255, shape=self.observation_shape, dtype=np.uint8)
+        if self._hud is None:
+            return pixels
+        hud = Box(low=0.0, high=1.0, shape=(len(self._hud),), dtype=np.float32)
+        if self._observation_hud == "only":
+            return hud
+        return Dict({"pixels": pixels, "hud": hud})
+
     @property
     def actions(self):
+        """tuple/HeldKeyActions: KeyboardKey per action, or the held key actions."""
+        if self._held_keys is not None:
+            return self._held_keys
         return self._actions
 
-    def observation(self, frame):
+    @property
+    def action_space(self):
+        """gym.spaces.Space: Discrete index in actions, or MultiDiscrete with held_keys."""
+        if self._held_keys is not None:
+            return self._held_keys.space
+        return Discrete(len(self._actions))
+
+    def observation(self, frame, skipped=False):
         """Cut out the region of interest of the actual game from the full frame.
 
+        Args:
+            frame (Frame): Frame to cut the observation from.
+            skipped (bool): The frame is skipped (see frame_skip); it only counts
+                for max pooling and is not stacked.
+
         Returns:
             np.ndarray: region of interest of the actual game
+                (or the HUD features, or a dict of both, see observation_space)
                 TODO: return None or should not be called with frame == None??
         """
         region = self.regions["GAME_SCREEN"]
         if not frame:
             return None
+        if self._observation_hud == "only":
+            return None if skipped else self._hud.extract(frame.img)
+
         roi = frame.img[region[0] : region[2], region[1] : region[3]]
-        return roi
+        if self._observation_buffer is not None:
+            roi = self._observation_buffer.write(roi, skipped)
+        if self._hud is None or skipped:
+            return roi
+        return {"pixels": roi, "hud": self._hud.extract(frame.img)}
         # return cv2.resize(roi, self.observation_dimensions())
 
     @abstractmethod
@@ -237,39 +447,220 @@ class BrawlStars(LDPlayer):
             Generic for each event.
 
         Args:
-            action (KeyboardKey): Action to take
+            action (KeyboardKey/sequence): Action to take; with held_keys the index
+                of the chosen option per dimension of HELD_KEY_ACTIONS.
 
         Returns:
             tuple(np.ndarray, float, bool, dict): with respectively
                 * the next observation,
                 * the reward of the action that was taken,
                 * if the game is done or not
-                * some generic info in dict form.
+                * some generic info in dict form, including the duration of each
+                  phase of the step as <phase>_duration (see stats()).
         """
         self._limiter.start()
+        step_started_at = time.time()
+        profiler = self._profiler
+        missed_frames = 0
+
+        for skip in range(self._frame_skip):
+            # tak action
+            with profiler.phase("input"):
+                if self._held_keys is None:
+                    self.input_controller.handle_keys([action])
+                elif not skip:
+                    # The keys stay held over the skipped frames
+                    self._send_keyboard_events(self._held_keys.events(action))
+
+            # Get next observation
+            with profiler.phase("capture"):
+                frame, missed = self._next_frame()
+            missed_frames += missed
+            with profiler.phase("observation"):
+                next_obs = self.observation(frame, skipped=skip < self._frame_skip - 1)
 
-        # tak action
-        self.input_controller.handle_keys([action])
+        # Check if done (defined per/in specific event)
+        with profiler.phase("done"):
+            done = self.done(frame)
+
+        # Get reward (defined per/in specific event)
+        if self._reward_executor is None:
+            with profiler.phase("reward"):
+                reward = self.reward(frame)
+            reward_info = {}
+        else:
+            with profiler.phase("reward_wait"):
+                reward, reward_info = self._async_reward(frame, done, step_started_at)
+
+        (_, step_duration, paused_duration) = self._limiter.stop_and_delay()
+        profiler.add("paused", paused_duration)
+        profiler.add("step", step_duration)
+        profiler.add("jitter", self._limiter.jitter)
+
+        info = {
+            "next_observation_timestamp": frame.timestamp,
+            "missed_frames": missed_frames,
+            "fps": self._limiter.step_fps,
+        }
+        info.update(
+            (name + "_duration", duration)
+            for name, duration in profiler.end_step().items()
+        )
+        info.update(reward_info)
+
+        if self._recorder is not None:
+            self._recorder.record(
+                next_obs, self.actions.index(action), reward, done, info
+            )
+
+        return next_obs, reward, done, info
+
+    def _send_keyboard_events(self, events):
+        """Presses (DOWN) and releases (UP) keys of the KeyboardEvent's."""
+        for event in events:
+            if event.event == KeyboardEvents.DOWN:
+                self.input_controller.press_key(event.keyboard_key)
+            else:
+                self.input_controller.release_key(event.keyboard_key)
+
+    def _next_frame(self):
+        """Returns a new frame, without sleeping longer than needed for it.
+
+        Returns:
+            tuple(Frame, int): The frame and the number of failed captures before it.
+
+        Raises:
+            RuntimeError: when there was no frame within frame_timeout seconds
+        """
+        if self._frame_capture is not None:
+            frame, missed_frames = self._frame_capture.wait_for_frame(
+                self._frame_timeout
+            )
+        else:
+            frame, missed_frames = self._grab_frame_with_backoff()
+
+        if frame is None:
+            raise RuntimeError("No frame within", self._frame_timeout, "seconds")
+        return frame, missed_frames
+
+    def _grab_frame_with_backoff(self):
+        """Grabs a frame; retries with a short, growing delay while there is none.
+
+        Returns:
+            tuple(Frame, int): The frame (None on timeout) and the number of retries.
+        """
+        deadline = None
+        if self._frame_timeout is not None:
+            deadline = time.monotonic() + self._frame_timeout
+        delay = FrameCapture.RETRY_DELAY
+        missed_frames = 0
 
-        # Get next observation
         frame = self.grab_frame()
         while frame is None:
-            time.sleep(0.5)
+            missed_frames += 1
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                delay = min(delay, remaining)
+            time.sleep(delay)
+            delay = min(2 * delay, FrameCapture.MAX_RETRY_DELAY)
             frame = self.grab_frame()
-        next_obs = self.observation(frame)
 
-        # Get reward (defined per/in specific event)
+        return frame, missed_frames
+
+    def stats(self):
+        """Returns statistics of the duration of each phase of the recent steps.
+
+        Phases are input, capture, observation, done, reward (or
+        reward_wait when asynchronous), paused and step, plus the phases that the
+        event adds, like the OCR of its reward. Jitter is how late steps started
+        after their deadline.
+
+        Returns:
+            dict: Per phase a dict with count, mean and p50, p95, p99 (seconds).
+        """
+        return self._profiler.stats()
+
+    def _timed_reward(self, frame):
+        """Returns the reward of frame and the time it took to determine it."""
+        started_at = time.perf_counter()
         reward = self.reward(frame)
+        return reward, time.perf_counter() - started_at
 
-        # Check if done (defined per/in specific event)
-        done = self.done(frame)
+    def _async_reward(self, frame, done, step_started_at):
+        """Submits the reward of frame to the worker and returns a finished reward.
 
-        (_, step_duration, paused_duration) = self._limiter.stop_and_delay()
+        That is the reward of frame itself when it is ready before the deadline,
+        or when the episode is done (it is waited for); otherwise the reward of the
+        previous frame, or 0 when there is none (e.g. on the first step). A pending
+        reward of a previous frame that is superseded by the reward of a later
+        frame is never returned; it is cancelled and counted in dropped_rewards.
 
-        info = {
-            "next_observation_timestamp": frame.timestamp,
-            "step_duration": step_duration,
-            "paused_duration": paused_duration,
+        Returns:
+            tuple(Number, dict): The reward and info on its frame and timing.
+        """
+        previous = self._pending_reward
+        self._pending_reward = (
+            frame.timestamp,
+            self._reward_executor.submit(self._timed_reward, frame),
+        )
+
+        if done:
+            timeout = None
+        elif self._reward_deadline is not None:
+            timeout = max(0.0, step_started_at + self._reward_deadline - time.time())
+        else:
+            timeout = 0.0
+
+        if timeout != 0.0 or previous is None:
+            try:
+                reward, info = self._resolve_pending_reward(
+                    self._pending_reward, timeout
+                )
+                if previous is not None:
+                    previous[1].cancel()
+                    info["dropped_rewards"] = 1
+                return reward, info
+            except TimeoutError:
+                if previous is None:
+                    return 0, {"reward_timestamp": None, "dropped_rewards": 0}
+            finally:
+                if done or self._pending_reward[1].done():
+                    self._pending_reward = None
+
+        return self._resolve_pending_reward(previous, None)
+
+    @staticmethod
+    def _resolve_pending_reward(pending, timeout):
+        """Waits for a pending reward; reports how much of its duration was hidden.
+
+        Raises:
+            TimeoutError: when the reward is not ready within timeout seconds
+        """
+        timestamp, future = pending
+        waited_since = time.perf_counter()
+        reward, duration = future.result(timeout=timeout)
+        waited = time.perf_counter() - waited_since
+        return reward, {
+            "reward_timestamp": timestamp,
+            "reward_duration": duration,
+            "reward_hidden_duration": max(0.0, duration - waited),
+            "dropped_rewards": 0,
         }
 
-        return next_obs, reward, done, info
+    def _new_episode(self):
+        """Forgets state of the previous episode; to be called by reset().
+
+        Drops the reward that would be delivered by the next step
+        and the frame that the next observation would be max-pooled with,
+        and releases held keys. The next step starts a new schedule.
+        """
+        self._limiter.reset()
+        if self._held_keys is not None:
+            self._send_keyboard_events(self._held_keys.release())
+        if self._pending_reward is not None:
+            self._pending_reward[1].cancel()
+            self._pending_reward = None
+        if self._observation_buffer is not None:
+            self._observation_buffer.clear()
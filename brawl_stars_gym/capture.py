@@ -0,0 +1,177 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+"""
+Frame capture on a dedicated thread that always holds the latest frame, so a
+step waits for a new frame on a condition variable (at most until the next
+frame arrives) instead of sleeping a fixed time when no frame is available.
+
+Captured images are copied into preallocated buffers that are swapped under a
+lock: one holds the latest completed frame, one is being written and the
+others hold the frames that were returned most recently, which are thus not
+overwritten while they are still being used (e.g. by an asynchronous reward).
+
+Capturing can be paused, e.g. while the menus are navigated with frames that
+are grabbed directly, so only one thread grabs frames at a time.
+
+When grabbing a frame raises an error, capturing stops and the error is raised
+by the next wait_for_frame or pause call instead of blocking these forever.
+
+"""
+
+CapturedFrame = namedtuple("CapturedFrame", ["img", "timestamp"])
+
+
+class FrameCapture:
+    RETRY_DELAY = 0.005
+    MAX_RETRY_DELAY = 0.1
+
+    def __init__(self, grab_frame, hold=1):
+        """Starts capturing frames.
+
+        Args:
+            grab_frame (callable): Returns a new frame, or None when none is available.
+            hold (int): Number of most recently returned frames whose buffers are
+                not overwritten, i.e. that stay valid after next wait_for_frame calls.
+        """
+        self._grab_frame = grab_frame
+        self._condition = threading.Condition()
+        self._frame = None
+        self._sequence = 0
+        self._returned_sequence = 0
+        self._missed_frames = 0
+        self._stopped = False
+        self._paused = False
+        self._grabbing = False
+        self._error = None
+
+        self._buffers = None
+        self._buffer_count = hold + 2
+        self._ready_buffer = None
+        self._held_buffers = deque(maxlen=hold)
+
+        self._thread = threading.Thread(target=self._capture, daemon=True)
+        self._thread.start()
+
+    def _capture(self):
+        try:
+            self._capture_frames()
+        except Exception as e:
+            # Raised in the stepping thread, which waits for frames
+            with self._condition:
+                self._error = e
+                self._condition.notify_all()
+
+    def _capture_frames(self):
+        delay = self.RETRY_DELAY
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._stopped or not self._paused)
+                if self._stopped:
+                    break
+                self._grabbing = True
+            try:
+                frame = self._grab_frame()
+            finally:
+                with self._condition:
+                    self._grabbing = False
+                    self._condition.notify_all()
+            if frame is None:
+                with self._condition:
+                    self._missed_frames += 1
+                # Short adaptive backoff while the window does not deliver frames
+                time.sleep(delay)
+                delay = min(2 * delay, self.MAX_RETRY_DELAY)
+                continue
+
+            delay = self.RETRY_DELAY
+            if self._buffers is None:
+                self._buffers = [
+                    np.empty_like(frame.img) for _ in range(self._buffer_count)
+                ]
+
+            with self._condition:
+                index = next(
+                    i
+                    for i in range(self._buffer_count)
+                    if i != self._ready_buffer and i not in self._held_buffers
+                )
+            np.copyto(self._buffers[index], frame.img)
+
+            with self._condition:
+                self._ready_buffer = index
+                self._frame = CapturedFrame(self._buffers[index], frame.timestamp)
+                self._sequence += 1
+                self._condition.notify_all()
+
+    def latest(self):
+        """Returns the most recently captured frame, or None when there is none yet.
+
+        The frame is not held; it may be overwritten by the next captures.
+        """
+        with self._condition:
+            return self._frame
+
+    def wait_for_frame(self, timeout=None):
+        """Waits for a frame that is newer than the previously returned one.
+
+        Returns at once when such a frame was captured since the previous call.
+
+        Args:
+            timeout (float): Maximal seconds to wait; None waits forever.
+
+        Returns:
+            tuple(CapturedFrame, int): The frame (None on timeout), with the
+                timestamp of its capture, and the number of failed captures since
+                the previous call.
+
+        Raises:
+            Exception: the error of the capture thread, when grabbing a frame failed
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._error is not None
+                or self._sequence > self._returned_sequence,
+                timeout=timeout,
+            )
+            self._raise_capture_error()
+            missed_frames, self._missed_frames = self._missed_frames, 0
+            if self._sequence == self._returned_sequence:
+                return None, missed_frames
+
+            self._returned_sequence = self._sequence
+            self._held_buffers.append(self._ready_buffer)
+            return self._frame, missed_frames
+
+    def pause(self):
+        """Pauses capturing; returns when the capture thread does not grab frames.
+
+        Raises:
+            Exception: the error of the capture thread, when grabbing a frame failed
+        """
+        with self._condition:
+            self._paused = True
+            self._condition.wait_for(lambda: not self._grabbing)
+            self._raise_capture_error()
+
+    def resume(self):
+        """Resumes capturing; frames captured before the pause are not returned."""
+        with self._condition:
+            self._paused = False
+            self._returned_sequence = self._sequence
+            self._missed_frames = 0
+            self._condition.notify_all()
+
+    def _raise_capture_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def stop(self):
+        """Stops capturing; returns when the capture thread has finished."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join()
@@ -0,0 +1,188 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+from brawl_stars_gym.brawl_stars import BrawlStars
+from brawl_stars_gym.replay import Recording
+from brawl_stars_gym.try_brawler import TryBrawler
+
+"""
+Command line tools of brawl_stars_gym.
+
+relabel: recomputes the TryBrawler rewards of recorded frames or episodes
+offline, e.g. after the reward definition or the digit reader changed. It scans
+a directory for recordings (frames.npy, see replay.py) and recorded episodes
+(chunk_*.npz shards, see recorder.py), reads the damage per second of all
+frames on all CPU cores and writes a rewards.npy (int32, a reward per frame or
+step) into each recording or episode directory.
+
+Episodes can only be relabeled when their observations are the full
+resolution BGR game screen (the default observation).
+
+"""
+
+REWARDS_FILENAME = "rewards.npy"
+
+
+def _reward_rois(task):
+    """Returns the reward regions of interest of the frames of a task."""
+    kind, directory, start, stop = task
+    top, left, bottom, right = TryBrawler.TRY_BRAWLER_REGIONS[
+        "REWARD_TRY_DAMAGE_PER_SECOND"
+    ]
+    if kind == "recording":
+        frames = Recording(directory).frames
+        return frames[start:stop, top:bottom, left:right]
+
+    # Observations of episodes are the game screen part of the frames
+    screen_top, screen_left, screen_bottom, screen_right = (
+        BrawlStars.BRAWL_STARS_REGIONS["GAME_SCREEN"]
+    )
+    shard = sorted(Path(directory).glob("chunk_*.npz"))[start]
+    with np.load(str(shard)) as arrays:
+        observations = arrays["observations"]
+    if observations.shape[1:] != (
+        screen_bottom - screen_top,
+        screen_right - screen_left,
+        3,
+    ):
+        raise ValueError(
+            "Observations are not full resolution BGR game screens",
+            shard,
+            observations.shape,
+        )
+    return observations[
+        :,
+        top - screen_top : bottom - screen_top,
+        left - screen_left : right - screen_left,
+    ]
+
+
+def _relabel(task, backend):
+    """Returns the rewards of the frames of a task (run in a worker process)."""
+    rois = _reward_rois(task)
+    rewards = TryBrawler.damage_per_second_batch(rois, backend)
+    return np.asarray(rewards, dtype=np.int32)
+
+
+def _find_tasks(directory, chunk_size):
+    """Returns the tasks per recording or episode directory below directory.
+
+    A task is (kind, directory, start, stop): a slice of chunk_size frames of a
+    recording, or the shard with index start of an episode.
+    """
+    tasks = {}
+    for frames_filepath in sorted(Path(directory).rglob(Recording.FRAMES_FILENAME)):
+        recording_dir = frames_filepath.parent
+        length = len(Recording(recording_dir))
+        tasks[recording_dir] = [
+            ("recording", str(recording_dir), start, min(start + chunk_size, length))
+            for start in range(0, length, chunk_size)
+        ]
+
+    episode_dirs = sorted({p.parent for p in Path(directory).rglob("chunk_*.npz")})
+    for episode_dir in episode_dirs:
+        shards = sorted(episode_dir.glob("chunk_*.npz"))
+        tasks[episode_dir] = [
+            ("episode", str(episode_dir), index, index + 1)
+            for index in range(len(shards))
+        ]
+    return tasks
+
+
+def relabel(directory, backend="template", workers=None, chunk_size=256):
+    """Recomputes the rewards of all recordings and episodes below directory.
+
+    Args:
+        directory (string): Directory to scan.
+        backend (string): One of TryBrawler.REWARD_BACKENDS.
+        workers (int): Number of worker processes; None uses all CPU cores.
+        chunk_size (int): Number of frames of a recording per task.
+
+    Returns:
+        int: Number of recordings and episodes that could not be relabeled.
+    """
+    tasks = _find_tasks(directory, chunk_size)
+    if not tasks:
+        print("No recordings or episodes found in", directory)
+        return 0
+
+    print(
+        "Relabeling {} recordings and episodes with {} workers".format(
+            len(tasks), workers or os.cpu_count()
+        )
+    )
+    parts = {
+        source: [None] * len(source_tasks) for source, source_tasks in tasks.items()
+    }
+    failed = set()
+    frames = 0
+    started_at = reported_at = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_relabel, task, backend): (source, index)
+            for source, source_tasks in tasks.items()
+            for index, task in enumerate(source_tasks)
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            source, index = futures[future]
+            try:
+                parts[source][index] = future.result()
+            except Exception as e:
+                if source not in failed:
+                    print("Could not relabel", source, e)
+                failed.add(source)
+                continue
+            frames += len(parts[source][index])
+
+            if all(part is not None for part in parts[source]):
+                rewards = np.concatenate(parts.pop(source))
+                np.save(str(source / REWARDS_FILENAME), rewards)
+
+            now = time.perf_counter()
+            if now - reported_at >= 1.0 or done == len(futures):
+                reported_at = now
+                print(
+                    "{}/{} tasks, {} frames, {:.1f} frames/s".format(
+                        done, len(futures), frames, frames / (now - started_at)
+                    )
+                )
+
+    return len(failed)
+
+
+def main(args=None):
+    """Entry point of the brawl_stars_gym command."""
+    parser = argparse.ArgumentParser(prog="brawl_stars_gym")
+    subparsers = parser.add_subparsers(dest="command")
+    relabel_parser = subparsers.add_parser(
+        "relabel", help="Recompute rewards of recorded frames or episodes."
+    )
+    relabel_parser.add_argument("directory", help="Directory to scan.")
+    relabel_parser.add_argument(
+        "--backend", choices=TryBrawler.REWARD_BACKENDS, default="template"
+    )
+    relabel_parser.add_argument(
+        "--workers", type=int, default=None, help="Default: number of CPU cores."
+    )
+    relabel_parser.add_argument(
+        "--chunk-size", type=int, default=256, help="Frames of a recording per task."
+    )
+    args = parser.parse_args(args)
+
+    if args.command != "relabel":
+        parser.print_help()
+        return 1
+    return (
+        1 if relabel(args.directory, args.backend, args.workers, args.chunk_size) else 0
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+"""
+Tesseract-free reader for the (blue) numbers that are displayed in the game,
+like the damage per second in the try brawler event.
+
+Digits are segmented with a colour mask and column projection and then
+matched against one glyph template per digit using normalized correlation.
+
+"""
+
+
+class DigitReader:
+    DIGITS_DIR = Path(__file__).parent / "data" / "try_brawler" / "digits"
+    TEMPLATE_SIZE = (10, 14)  # width, height
+
+    TEXT_COLOR_BGR = np.array([255, 136, 136])
+    TEXT_COLOR_BGR_DEV = np.array([15] * 3)
+
+    _default = None
+
+    def __init__(self, templates, min_score=0.6, min_glyph_height=0.4):
+        """
+        Args:
+            templates (dict): Glyph image (np.ndarray, 2D) per digit (int 0-9).
+            min_score (float): Minimal normalized correlation of each glyph
+                with its best matching template; below it read() gives up.
+            min_glyph_height (float): Minimal height of a glyph relative to the
+                height of the region of interest; smaller blobs are noise.
+        """
+        self._digits = np.array(sorted(templates), dtype=np.int64)
+        self._templates = np.stack(
+            [self._normalize(templates[digit]) for digit in self._digits]
+        )
+        self._min_score = min_score
+        self._min_glyph_height = min_glyph_height
+
+    @classmethod
+    def default(cls):
+        """Returns the reader with the bundled templates; loaded once per process.
+
+        Returns:
+            DigitReader: Reader with bundled templates or None when these are missing.
+        """
+        if cls._default is None:
+            try:
+                cls._default = cls.from_directory(cls.DIGITS_DIR)
+            except FileNotFoundError as e:
+                print("Digit templates missing, reading digits with Tesseract:", e)
+                cls._default = False
+        return cls._default or None
+
+    @classmethod
+    def has_default(cls):
+        """Returns if all bundled templates are present, without loading them."""
+        return all(
+            (cls.DIGITS_DIR / "digit_{}.png".format(digit)).is_file()
+            for digit in range(10)
+        )
+
+    @classmethod
+    def from_directory(cls, directory, **kwargs):
+        """Loads templates digit_0.png ... digit_9.png from the given directory.
+
+        Raises:
+            FileNotFoundError: when not all ten templates are present
+        """
+        templates = {}
+        for digit in range(10):
+            filepath = Path(directory) / "digit_{}.png".format(digit)
+            img = cv2.imread(str(filepath), cv2.IMREAD_GRAYSCALE)
+            if img is None:
+                raise FileNotFoundError("Missing digit template", str(filepath))
+            templates[digit] = img
+        return cls(templates, **kwargs)
+
+    @classmethod
+    def from_samples(cls, samples, **kwargs):
+        """Builds templates by averaging the glyphs of labelled samples.
+
+        Args:
+            samples (iterable): (roi, number) tuples, with roi the BGR image that
+                contains the number (int) that is displayed in it.
+
+        Returns:
+            DigitReader: Reader with the learned templates.
+
+        Raises:
+            ValueError: when not every digit occurs in the samples
+        """
+        sums = {}
+        counts = {}
+        for roi, number in samples:
+            glyphs = cls.segment(roi)
+            digits = [int(d) for d in str(number)] if number else []
+            if len(glyphs) != len(digits):
+                continue
+            for glyph, digit in zip(glyphs, digits):
+                sums[digit] = sums.get(digit, 0) + glyph
+                counts[digit] = counts.get(digit, 0) + 1
+
+        missing = set(range(10)) - set(sums)
+        if missing:
+            raise ValueError("No samples for digits", sorted(missing))
+
+        templates = {
+            digit: (sums[digit] / counts[digit] * 255).astype(np.uint8)
+            for digit in sums
+        }
+        return cls(templates, **kwargs)
+
+    def save(self, directory):
+        """Saves the templates as digit_<digit>.png in the given directory."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        width, height = self.TEMPLATE_SIZE
+        for digit, template in zip(self._digits, self._templates):
+            img = template.reshape(height, width)
+            img = cv2.normalize(img, None, 0, 255, cv2.NORM_MINMAX)
+            cv2.imwrite(
+                str(directory / "digit_{}.png".format(digit)), img.astype(np.uint8)
+            )
+
+    @classmethod
+    def mask(cls, roi):
+        """Returns a binary mask (np.ndarray of bool) of the text coloured pixels."""
+        mask = cv2.inRange(
+            roi,
+            cls.TEXT_COLOR_BGR - cls.TEXT_COLOR_BGR_DEV,
+            cls.TEXT_COLOR_BGR + cls.TEXT_COLOR_BGR_DEV,
+        )
+        return mask > 0
+
+    @classmethod
+    def segment(cls, roi, min_glyph_height=0.4):
+        """Splits the text in the region of interest into glyphs, from left to right.
+
+        Args:
+            roi (np.ndarray): BGR image that contains the number.
+            min_glyph_height (float): Minimal glyph height relative to roi height.
+
+        Returns:
+            list: Glyphs as float32 images of TEMPLATE_SIZE with values in [0, 1].
+        """
+        mask = cls.mask(roi)
+        columns = np.flatnonzero(mask.any(axis=0))
+        if columns.size == 0:
+            return []
+
+        # Runs of consecutive text columns are the individual glyphs
+        splits = np.flatnonzero(np.diff(columns) > 1) + 1
+        glyphs = []
+        for run in np.split(columns, splits):
+            glyph = mask[:, run[0] : run[-1] + 1]
+            rows = np.flatnonzero(glyph.any(axis=1))
+            if rows[-1] - rows[0] + 1 < min_glyph_height * mask.shape[0]:
+                continue
+            glyph = glyph[rows[0] : rows[-1] + 1].astype(np.float32)
+            glyphs.append(
+                cv2.resize(glyph, cls.TEMPLATE_SIZE, interpolation=cv2.INTER_AREA)
+            )
+        return glyphs
+
+    @staticmethod
+    def _normalize(glyph):
+        """Flattens glyph to a zero mean, unit length vector (for correlation)."""
+        vector = np.asarray(glyph, dtype=np.float32).ravel()
+        vector = vector - vector.mean()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def read(self, roi):
+        """Extracts and returns the number in the given region of interest image.
+
+        Args:
+            roi (np.ndarray): BGR image that contains only the number to be extracted.
+
+        Returns:
+            Int: The extracted number (0 when no digits are visible) or
+                None when a glyph could not be matched with enough confidence.
+        """
+        glyphs = self.segment(roi, self._min_glyph_height)
+        if not glyphs:
+            return 0
+
+        vectors = np.stack([self._normalize(glyph) for glyph in glyphs])
+        scores = vectors @ self._templates.T
+        best = scores.argmax(axis=1)
+        if scores[np.arange(len(best)), best].min() < self._min_score:
+            return None
+
+        number = 0
+        for digit in self._digits[best]:
+            number = number * 10 + int(digit)
+        return number
@@ -0,0 +1,28 @@
+"""
+Entry points of the registered gym environments.
+
+They import the games, and with them cv2, numpy, pytesseract and game_control,
+only when an environment is constructed, so importing the package (which
+registers the environments) stays cheap.
+
+"""
+
+
+def _game_env(game_class, **kwargs):
+    from game_control.envs.game.game_env import GameEnv
+
+    return GameEnv(game_class=game_class, **kwargs)
+
+
+def try_brawler(**kwargs):
+    """Returns a GameEnv of TryBrawler; kwargs are passed to GameEnv."""
+    from brawl_stars_gym.try_brawler import TryBrawler
+
+    return _game_env(TryBrawler, **kwargs)
+
+
+def showdown_solo(**kwargs):
+    """Returns a GameEnv of ShowdownSolo; kwargs are passed to GameEnv."""
+    from brawl_stars_gym.showdown_solo import ShowdownSolo
+
+    return _game_env(ShowdownSolo, **kwargs)
@@ -0,0 +1,90 @@
+from collections import namedtuple
+
+import numpy as np
+
+"""
+Low-dimensional observation of the HUD (health, ammo, super charge, ...), as a
+small float vector instead of the pixels of the game screen.
+
+Each feature is the fill of a fixed region of the 960x540 frame with a colour:
+the fraction of its columns (bars, text) or pixels (round buttons) that have
+the colour, optionally per segment (like the ammo bar). Only NumPy colour masks
+and counts; no OCR.
+
+"""
+
+HudFeature = namedtuple(
+    "HudFeature", ["name", "region", "color_bgr", "tolerance", "measure", "segments"]
+)
+HudFeature.__doc__ = """Feature of the HUD.
+
+Args:
+    name (string): Name of the feature.
+    region (tuple): (top, left, bottom, right) of the feature in the frame.
+    color_bgr (tuple): Colour of the filled part.
+    tolerance (int): Maximal deviation per channel from color_bgr.
+    measure (string): "columns" for the fraction of columns with the colour
+        (bars, text), "pixels" for the fraction of pixels with it.
+    segments (int): Number of equally wide parts that are measured separately.
+"""
+
+
+class HudFeatureExtractor:
+    MEASURES = ("columns", "pixels")
+
+    def __init__(self, features):
+        """
+        Args:
+            features (sequence): HudFeature's to extract.
+        """
+        for feature in features:
+            if feature.measure not in self.MEASURES:
+                raise ValueError("Unknown HUD measure", feature.name, feature.measure)
+        self._features = tuple(features)
+        # Per feature and channel the lower bound and the span of the colour range
+        self._ranges = []
+        for f in self._features:
+            color = np.array(f.color_bgr, np.int16)
+            lower = np.clip(color - f.tolerance, 0, 255).astype(np.uint8)
+            upper = np.clip(color + f.tolerance, 0, 255).astype(np.uint8)
+            self._ranges.append(list(zip(lower, upper - lower)))
+        self.names = [
+            f.name if f.segments == 1 else "{}_{}".format(f.name, segment)
+            for f in self._features
+            for segment in range(f.segments)
+        ]
+
+    def __len__(self):
+        return len(self.names)
+
+    def extract(self, img):
+        """Returns the features of a frame.
+
+        Args:
+            img (np.ndarray): BGR image of the full frame.
+
+        Returns:
+            np.ndarray: float32 vector with a value in [0, 1] per name in names.
+        """
+        features = np.empty(len(self.names), dtype=np.float32)
+        index = 0
+        for feature, ranges in zip(self._features, self._ranges):
+            top, left, bottom, right = feature.region
+            roi = img[top:bottom, left:right]
+            # Per channel: lower <= value <= lower + span, as one comparison of
+            # the wrapped around uint8 difference
+            mask = None
+            for channel, (lower, span) in enumerate(ranges):
+                in_range = (roi[..., channel] - lower) <= span
+                mask = in_range if mask is None else mask & in_range
+            if feature.measure == "columns":
+                mask = mask.any(axis=0)
+            else:
+                mask = mask.T
+
+            segments = feature.segments
+            width = mask.shape[0] // segments * segments
+            parts = mask[:width].reshape(segments, -1)
+            features[index : index + segments] = parts.mean(axis=1)
+            index += segments
+        return features
@@ -1,11 +1,16 @@
+import time
 from pathlib import Path
 
 from game_control.games.executable_game import ExecutableGame
-from game_control.sprite import Sprite
+
+from brawl_stars_gym.sprite_matcher import SpriteMatcher
+from brawl_stars_gym.sprite_registry import SPRITE_REGISTRY
 
 
 class LDPlayer(ExecutableGame):
     LDPLAYER_DIR = Path("ldplayer")
+    SPRITE_TIMEOUT = 60
+    SPRITE_POLL_INTERVAL = 0.1
 
     def __init__(self, ldplayer_executable_filepath, **kwargs):
         """
@@ -14,8 +19,10 @@ class LDPlayer(ExecutableGame):
         """
         super().__init__(ldplayer_executable_filepath, window_name="LDPlayer", **kwargs)
 
+        self._sprite_matcher = SpriteMatcher()
+
         self.sprites.update(
-            Sprite.discover_sprites(
+            SPRITE_REGISTRY.discover(
                 Path(__file__).parent
                 / self.DATA_DIR
                 / self.LDPLAYER_DIR
@@ -37,8 +44,8 @@ class LDPlayer(ExecutableGame):
         # LDPlayer sometimes resizes when fully started,
         # so search for sprite globally and re-initialize afterwards.
         sprite = self.sprites["SPRITE_LDPLAYER"]
-        found, frame, location = self._wait_for_sprite(
-            sprite, msg="Waiting for LDPlayer"
+        found, frame, location = self._wait_for_sprites(
+            [(sprite, None)], msg="Waiting for LDPlayer"
         )
         if not found:
             raise RuntimeError("Could not find sprite", sprite.name, "in time")
@@ -47,3 +54,39 @@ class LDPlayer(ExecutableGame):
         print("Found sprite at location", location)
 
         return frame
+
+    def _locate_sprite(self, frame, sprite, region=None):
+        """Returns location (top, left, bottom, right) of sprite in frame, or None."""
+        return self._sprite_matcher.locate(frame.img, sprite, region)
+
+    def _wait_for_sprites(self, targets, timeout=None, msg=None):
+        """Waits until one of the sprites is visible; checks all in the same frame.
+
+        Sprites without region are searched in the whole frame, coarse-to-fine.
+
+        Args:
+            targets (sequence): (sprite, region) tuples; region may be None.
+            timeout (float): Maximal seconds to wait; defaults to SPRITE_TIMEOUT.
+            msg (string): Printed once when the sprites are not visible at once.
+
+        Returns:
+            tuple(Sprite, Frame, tuple): The first of the targets' sprites that
+                is found (None on timeout), the last frame and the location
+                (top, left, bottom, right) of the found sprite.
+        """
+        deadline = time.monotonic() + (timeout or self.SPRITE_TIMEOUT)
+        frame = None
+        while True:
+            frame = self.grab_frame()
+            if frame is not None:
+                locations = self._sprite_matcher.locate_all(frame.img, targets)
+                for (sprite, _), location in zip(targets, locations):
+                    if location is not None:
+                        return sprite, frame, location
+
+            if time.monotonic() >= deadline:
+                return None, frame, None
+            if msg:
+                print(msg)
+                msg = None
+            time.sleep(self.SPRITE_POLL_INTERVAL)
@@ -0,0 +1,131 @@
+import time
+from collections import namedtuple
+
+"""
+Declarative navigation through menus, like starting, stopping and restarting
+an event.
+
+A script is a sequence of steps: wait for the sprite of a region
+("SPRITE_" + region name) to be visible in that region and then maybe click
+the region. Instead of polling at a fixed rate, the navigator learns how long
+the transition to each step typically takes: once it has been measured, it
+does not poll before the transition can have happened and then polls at a
+rate relative to it until the transition is overdue, after which it backs off
+(but never polls slower than MAX_POLL_INTERVAL).
+
+"""
+
+NavigationStep = namedtuple(
+    "NavigationStep", ["region_name", "click", "expected_latency"]
+)
+NavigationStep.__doc__ = """Step of a navigation script.
+
+Args:
+    region_name (string): Region whose sprite to wait for.
+    click (bool): Click the region when its sprite is visible.
+    expected_latency (float): Initially expected seconds until the sprite is
+        visible, which sets the poll rate; replaced by the learned latency once
+        the step has been run.
+"""
+
+
+class Navigator:
+    MIN_POLL_INTERVAL = 0.02
+    MAX_POLL_INTERVAL = 0.1
+    # Fraction of the learned latency that is waited before polling starts
+    POLL_START = 0.5
+
+    def __init__(self, game, click_ahead=True, settle=0.2, timeout=60, smoothing=0.5):
+        """
+        Args:
+            game (LDPlayer): Game to navigate.
+            click_ahead (bool): Click as soon as a sprite is seen, like waiting for
+                sprites did before; otherwise wait settle seconds and check the
+                sprite is still visible before clicking.
+            settle (float): Seconds to let a screen settle before clicking.
+            timeout (float): Maximal seconds to wait for each sprite.
+            smoothing (float): Weight of the latest latency in the learned latency
+                (exponential moving average); the first measured latency replaces
+                the expected_latency of the script.
+        """
+        self._game = game
+        self._click_ahead = click_ahead
+        self._settle = settle
+        self._timeout = timeout
+        self._smoothing = smoothing
+        self.latencies = {}
+        self.last_duration = None
+
+    def run(self, name, script):
+        """Runs the navigation script; returns when its last sprite is visible.
+
+        Args:
+            name (string): Name of the script, under which latencies are learned.
+            script (sequence): NavigationStep's.
+
+        Returns:
+            Frame: Frame in which the sprite of the last step was found
+                (the next frame for an empty script).
+
+        Raises:
+            RuntimeError: when a sprite could not be found in time
+        """
+        started_at = time.monotonic()
+        frame = None
+        for index, step in enumerate(script):
+            frame = self._run_step((name, index), step)
+        if frame is None:
+            frame = self._game.grab_frame()
+
+        self.last_duration = time.monotonic() - started_at
+        return frame
+
+    def _run_step(self, key, step):
+        game = self._game
+        sprite = game.sprites["SPRITE_" + step.region_name]
+        region = game.regions[step.region_name]
+
+        started_at = time.monotonic()
+        learned_latency = self.latencies.get(key)
+        expected_latency = (
+            step.expected_latency if learned_latency is None else learned_latency
+        )
+        deadline = started_at + self._timeout
+
+        if learned_latency is not None:
+            # The transition can not have happened much earlier than it usually does
+            time.sleep(self.POLL_START * learned_latency)
+        interval = min(
+            max(expected_latency / 20, self.MIN_POLL_INTERVAL), self.MAX_POLL_INTERVAL
+        )
+
+        seen_at = None
+        while True:
+            frame = game.grab_frame()
+            if frame is not None and game._locate_sprite(frame, sprite, region):
+                seen_at = seen_at or time.monotonic()
+                if self._click_ahead or not step.click:
+                    break
+                time.sleep(self._settle)
+                frame = game.grab_frame()
+                if frame is not None and game._locate_sprite(frame, sprite, region):
+                    break
+
+            if time.monotonic() >= deadline:
+                raise RuntimeError("Could not find sprite", sprite.name, "in time")
+            time.sleep(interval)
+            if time.monotonic() - started_at >= expected_latency:
+                # Later than expected; back off
+                interval = min(1.5 * interval, self.MAX_POLL_INTERVAL)
+
+        latency = seen_at - started_at
+        if learned_latency is not None:
+            latency = (
+                self._smoothing * latency + (1 - self._smoothing) * learned_latency
+            )
+        self.latencies[key] = latency
+
+        if step.click:
+            game.input_controller.click_screen_region(region)
+
+        return frame
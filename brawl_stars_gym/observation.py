@@ -0,0 +1,159 @@
+import cv2
+import numpy as np
+
+"""
+Preallocated observation buffers, so the observations of consecutive steps are
+written into memory that is owned by the environment instead of being sliced
+from each frame and copied again by every consumer.
+
+Optionally observations are downscaled, converted to grayscale and max-pooled
+over the last two frames (like the usual Atari preprocessing), so the learner
+does not have to do this for every observation itself.
+
+Optionally the last k observations are stacked. The ring then has k - 1 extra
+slots at its end that duplicate its first k - 1 slots, so the last k
+observations are always contiguous and a stack is a view of the ring: stacking
+copies nothing (except those duplicates) until the learner materializes it.
+Memory of the ring is (size + k - 1) * width * height * channels bytes; with
+the default size of k + 1 that is 2k observations, e.g. for k = 4:
+
+    resolution        color        grayscale
+    900x512 (native)  11.1 MB      3.7 MB
+    450x256           2.8 MB       0.9 MB
+    225x128           0.7 MB       0.2 MB
+    84x84             0.2 MB       56 KB
+
+"""
+
+
+class ObservationBuffer:
+    LAYOUTS = ("HWC", "CHW")
+
+    def __init__(
+        self,
+        width,
+        height,
+        size=4,
+        layout="HWC",
+        grayscale=False,
+        max_pool=False,
+        stack=1,
+    ):
+        """
+        Args:
+            width (int): Width of an observation; regions of interest with another
+                width (or height) are resized.
+            height (int): Height of an observation.
+            size (int): Number of observations in the ring. An observation stays
+                valid (is not overwritten) for the next size - stack writes.
+            layout (string): One of LAYOUTS; "CHW" puts the channels first,
+                like torch expects.
+            grayscale (bool): Store single channel (grayscale) observations.
+            max_pool (bool): Store the pixelwise maximum of the last two written
+                regions of interest, against flickering sprites.
+            stack (int): Number of most recent observations that write() returns
+                stacked: (stack, height, width, channels) for "HWC" and
+                (stack * channels, height, width) for "CHW".
+        """
+        if layout not in self.LAYOUTS:
+            raise ValueError("Unknown observation layout", layout)
+        if size < stack:
+            raise ValueError("Ring smaller than stack", size, stack)
+
+        channels = 1 if grayscale else 3
+        if layout == "HWC":
+            shape = (height, width, channels)
+        else:
+            shape = (channels, height, width)
+
+        self._layout = layout
+        self._grayscale = grayscale
+        self._max_pool = max_pool
+        self._size = size
+        self._stack = stack
+        self._slots = np.zeros((size + stack - 1,) + shape, dtype=np.uint8)
+        self._index = 0
+        self._stack_empty = True
+
+        # Scratch buffers of the preprocessing stages, in HWC layout
+        self._resized = np.zeros((height, width, 3), dtype=np.uint8)
+        self._gray = np.zeros((height, width), dtype=np.uint8)
+        self._last = np.zeros((height, width, channels), dtype=np.uint8)
+        self._pooled = np.zeros((height, width, channels), dtype=np.uint8)
+
+    @property
+    def shape(self):
+        """tuple: Shape of the observations (stacks) that are returned by write()."""
+        shape = self._slots.shape[1:]
+        if self._stack == 1:
+            return shape
+        if self._layout == "CHW":
+            return (self._stack * shape[0],) + shape[1:]
+        return (self._stack,) + shape
+
+    @property
+    def nbytes(self):
+        """int: Memory used by the whole ring."""
+        return self._slots.nbytes
+
+    def clear(self):
+        """Forgets the last regions of interest, e.g. at the start of an episode.
+
+        The first stack after clearing repeats its observation.
+        """
+        self._last.fill(0)
+        self._stack_empty = True
+
+    def write(self, roi, skipped=False):
+        """Converts roi into the next slot of the ring; allocates nothing.
+
+        Args:
+            roi (np.ndarray): BGR (HWC) region of interest of the frame;
+                may be a non contiguous view in the full frame.
+            skipped (bool): The frame is skipped (see frame skipping): it is only
+                remembered for max pooling, not written.
+
+        Returns:
+            np.ndarray: The contiguous observation (stack), a view in the ring;
+                None when skipped.
+        """
+        if skipped and not self._max_pool:
+            return None
+
+        img = roi
+        height, width = self._resized.shape[:2]
+        if img.shape[:2] != (height, width):
+            # Downscale before color conversion, so that works on fewer pixels
+            img = cv2.resize(
+                img, (width, height), dst=self._resized, interpolation=cv2.INTER_AREA
+            )
+        if self._grayscale:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY, dst=self._gray)
+            img = img[..., np.newaxis]
+        if self._max_pool:
+            np.maximum(img, self._last, out=self._pooled)
+            np.copyto(self._last, img)
+            img = self._pooled
+        if skipped:
+            return None
+
+        index = self._index
+        self._index = (index + 1) % self._size
+        slot = self._slots[index]
+        if self._layout == "CHW":
+            np.copyto(slot, img.transpose(2, 0, 1))
+        else:
+            np.copyto(slot, img)
+        if self._stack == 1:
+            return slot
+
+        if self._stack_empty:
+            # Start the stack with copies of this observation
+            self._slots[:] = slot
+            self._stack_empty = False
+        elif index < self._stack - 1:
+            np.copyto(self._slots[self._size + index], slot)
+
+        # The last stack observations end at index, or at its duplicate
+        end = index + 1 if index >= self._stack - 1 else self._size + index + 1
+        return self._slots[end - self._stack : end].reshape(self.shape)
@@ -0,0 +1,128 @@
+import csv
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+"""
+Per-phase timing of steps, like capturing the frame, handling input, OCR and
+throttling, with rolling percentiles over the last steps. Optionally the
+statistics are dumped periodically to a CSV or JSON file, to profile long
+runs without attaching a profiler.
+
+"""
+
+
+class StepProfiler:
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, window=1000, dump_filepath=None, dump_interval=60.0):
+        """
+        Args:
+            window (int): Number of most recent steps the statistics are over.
+            dump_filepath (string): File (.csv or .json) the statistics are appended
+                to every dump_interval seconds; None does not dump.
+            dump_interval (float): Seconds between dumps.
+        """
+        self._window = window
+        self._durations = {}
+        self._step_durations = {}
+        self._lock = threading.Lock()
+
+        self._dump_filepath = Path(dump_filepath) if dump_filepath else None
+        self._dump_interval = dump_interval
+        self._dumped_at = time.time()
+
+    def add(self, name, duration):
+        """Adds duration (seconds) to the phase name of the current step."""
+        with self._lock:
+            self._step_durations[name] = self._step_durations.get(name, 0.0) + duration
+
+    @contextmanager
+    def phase(self, name):
+        """Context manager that adds its duration to the phase name of the current step."""
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started_at)
+
+    def end_step(self):
+        """Ends the current step; its phase durations enter the rolling window.
+
+        Returns:
+            dict: Duration (seconds) per phase of the step that ended.
+        """
+        with self._lock:
+            step_durations = self._step_durations
+            self._step_durations = {}
+            for name, duration in step_durations.items():
+                if name not in self._durations:
+                    self._durations[name] = deque(maxlen=self._window)
+                self._durations[name].append(duration)
+
+        if (
+            self._dump_filepath is not None
+            and time.time() - self._dumped_at >= self._dump_interval
+        ):
+            self.dump()
+
+        return step_durations
+
+    def stats(self):
+        """Returns statistics per phase over the rolling window.
+
+        Returns:
+            dict: Per phase a dict with count, mean and p50, p95, p99 (seconds).
+        """
+        with self._lock:
+            durations = {name: list(values) for name, values in self._durations.items()}
+
+        stats = {}
+        for name, values in durations.items():
+            percentiles = np.percentile(values, self.PERCENTILES)
+            stats[name] = {"count": len(values), "mean": float(np.mean(values))}
+            stats[name].update(
+                ("p{}".format(p), float(v))
+                for p, v in zip(self.PERCENTILES, percentiles)
+            )
+        return stats
+
+    def dump(self, filepath=None):
+        """Appends the current statistics to a CSV (a row per phase) or JSON file.
+
+        Args:
+            filepath (string): File to append to; defaults to dump_filepath.
+        """
+        filepath = Path(filepath) if filepath else self._dump_filepath
+        self._dumped_at = now = time.time()
+        stats = self.stats()
+
+        if filepath.suffix == ".json":
+            # JSON lines: one object per dump
+            with filepath.open("a") as f:
+                f.write(json.dumps({"timestamp": now, "stats": stats}) + "\n")
+            return
+
+        columns = ["count", "mean"] + ["p{}".format(p) for p in self.PERCENTILES]
+        write_header = not filepath.exists()
+        with filepath.open("a", newline="") as f:
+            writer = csv.writer(f)
+            if write_header:
+                writer.writerow(["timestamp", "phase"] + columns)
+            for name, phase_stats in sorted(stats.items()):
+                writer.writerow([now, name] + [phase_stats[c] for c in columns])
+
+
+@contextmanager
+def profile_phase(profiler, name):
+    """Times phase name with profiler, when there is one (it may be None)."""
+    if profiler is None:
+        yield
+    else:
+        with profiler.phase(name):
+            yield
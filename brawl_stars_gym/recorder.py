@@ -0,0 +1,194 @@
+import queue
+import threading
+from pathlib import Path
+
+import numpy as np
+
+"""
+Records episodes (observations, actions, rewards, done and info) for offline
+reinforcement learning and debugging.
+
+Steps are collected in chunks of preallocated arrays; full chunks are
+compressed and written by a background thread, so recording only costs the
+step loop a copy of the observation. Each episode is a directory with one
+.npz shard per chunk:
+    episode_00000/chunk_00000.npz
+    episode_00000/chunk_00001.npz
+    ...
+
+When writing a shard fails, the writer keeps accepting (and drops) chunks, and
+its error is raised by the next record(), flush() or close().
+
+"""
+
+
+class EpisodeRecorder:
+    def __init__(self, directory, chunk_size=256, compress=True, max_pending_chunks=8):
+        """
+        Args:
+            directory (string): Directory to write the episodes to.
+            chunk_size (int): Number of steps per shard.
+            compress (bool): Compress shards (zlib); otherwise store them raw.
+            max_pending_chunks (int): Number of full chunks that may wait for the
+                writer; when it falls further behind record() blocks.
+        """
+        self._directory = Path(directory)
+        self._chunk_size = chunk_size
+        self._save = np.savez_compressed if compress else np.savez
+
+        self._episode = self._next_episode_number()
+        self._chunk = 0
+        self._chunk_arrays = None
+        self._length = 0
+
+        self._queue = queue.Queue(maxsize=max_pending_chunks)
+        self._error = None
+        self._writer = threading.Thread(target=self._write_chunks, daemon=True)
+        self._writer.start()
+
+    def _next_episode_number(self):
+        """Continues numbering after episodes that are already in the directory."""
+        episodes = sorted(self._directory.glob("episode_*"))
+        return int(episodes[-1].name.split("_")[1]) + 1 if episodes else 0
+
+    def _new_chunk(self, observation):
+        return {
+            "observations": np.zeros(
+                (self._chunk_size,) + observation.shape, observation.dtype
+            ),
+            "actions": np.zeros(self._chunk_size, np.int64),
+            "rewards": np.zeros(self._chunk_size, np.float64),
+            "dones": np.zeros(self._chunk_size, bool),
+            "info": {},
+        }
+
+    def record(self, observation, action, reward, done, info):
+        """Records a step; the observation is copied, so its buffer may be reused.
+
+        Args:
+            observation (np.ndarray): The observation after the action.
+            action (int): Index of the action that was taken.
+            reward (float): The reward of the action.
+            done (bool): If the episode is done; then it is written.
+            info (dict): Info of the step; its numeric values are recorded
+                (missing or None values as NaN).
+
+        Raises:
+            ValueError: when the observation is a dict (Dict observation space)
+            Exception: the error of the writer, when writing a shard failed
+        """
+        self._raise_writer_error()
+        if isinstance(observation, dict):
+            raise ValueError(
+                "Can not record Dict observations", sorted(observation.keys())
+            )
+        if self._chunk_arrays is None:
+            self._chunk_arrays = self._new_chunk(observation)
+
+        arrays = self._chunk_arrays
+        index = self._length
+        arrays["observations"][index] = observation
+        arrays["actions"][index] = action
+        arrays["rewards"][index] = reward
+        arrays["dones"][index] = done
+        for key, value in info.items():
+            if value is None or isinstance(value, (int, float, np.number)):
+                if key not in arrays["info"]:
+                    arrays["info"][key] = np.full(self._chunk_size, np.nan)
+                arrays["info"][key][index] = np.nan if value is None else value
+        self._length += 1
+
+        if done:
+            self.flush()
+            self._episode += 1
+            self._chunk = 0
+        elif self._length == self._chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Hands the steps recorded since the previous flush to the writer."""
+        self._raise_writer_error()
+        if not self._length:
+            return
+
+        arrays = self._chunk_arrays
+        shard = {
+            key: arrays[key][: self._length]
+            for key in ("observations", "actions", "rewards", "dones")
+        }
+        shard.update(
+            ("info_" + key, values[: self._length])
+            for key, values in arrays["info"].items()
+        )
+        filepath = (
+            self._directory
+            / "episode_{:05d}".format(self._episode)
+            / "chunk_{:05d}.npz".format(self._chunk)
+        )
+        self._queue.put((filepath, shard))
+
+        self._chunk += 1
+        self._chunk_arrays = None
+        self._length = 0
+
+    def _write_chunks(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                if self._error is not None:
+                    continue
+                filepath, shard = item
+                filepath.parent.mkdir(parents=True, exist_ok=True)
+                self._save(str(filepath), **shard)
+            except Exception as e:
+                # Raised in the recording thread; keep draining the queue, so
+                # record() does not block on it
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _raise_writer_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        """Writes the remaining steps and waits until everything is written.
+
+        Raises:
+            Exception: the error of the writer, when writing a shard failed
+        """
+        try:
+            self.flush()
+        finally:
+            self._queue.put(None)
+            self._writer.join()
+        self._raise_writer_error()
+
+    @staticmethod
+    def load_episode(episode_directory):
+        """Loads all shards of a recorded episode.
+
+        Returns:
+            dict: observations, actions, rewards, dones and info_<key> arrays,
+                concatenated over the shards.
+        """
+        shards = [
+            np.load(str(filepath))
+            for filepath in sorted(Path(episode_directory).glob("chunk_*.npz"))
+        ]
+        keys = set().union(*(shard.files for shard in shards))
+        episode = {}
+        for key in keys:
+            episode[key] = np.concatenate(
+                [
+                    (
+                        shard[key]
+                        if key in shard.files
+                        else np.full(len(shard["dones"]), np.nan)
+                    )
+                    for shard in shards
+                ]
+            )
+        return episode
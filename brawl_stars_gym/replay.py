@@ -0,0 +1,206 @@
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+
+from brawl_stars_gym.ldplayer import LDPlayer
+from brawl_stars_gym.sprite_registry import SPRITE_REGISTRY
+
+"""
+Offline stand-in for LDPlayer that serves recorded frames, so events like
+TryBrawler can step, determine rewards and reset without a running emulator,
+e.g. for regression tests and profiling on CI.
+
+A recording is a directory with numpy files that are memory-mapped:
+    frames.npy      (N, 540, 960, 3) uint8 BGR full frames
+    timestamps.npy  (N,) float64 timestamps of the frames
+    actions.npy     (N,) int64 indices in the actions of the game (optional)
+
+"""
+
+ReplayFrame = namedtuple("ReplayFrame", ["img", "timestamp"])
+
+
+class Recording:
+    FRAMES_FILENAME = "frames.npy"
+    TIMESTAMPS_FILENAME = "timestamps.npy"
+    ACTIONS_FILENAME = "actions.npy"
+
+    def __init__(self, directory):
+        """Memory-maps the recording in the given directory."""
+        directory = Path(directory)
+        self.frames = np.load(str(directory / self.FRAMES_FILENAME), mmap_mode="r")
+        self.timestamps = np.load(str(directory / self.TIMESTAMPS_FILENAME))
+        actions_filepath = directory / self.ACTIONS_FILENAME
+        self.actions = (
+            np.load(str(actions_filepath)) if actions_filepath.exists() else None
+        )
+
+    def __len__(self):
+        return len(self.frames)
+
+    @classmethod
+    def save(cls, directory, frames, timestamps, actions=None):
+        """Saves frames, timestamps and (optionally) actions as a recording."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(str(directory / cls.FRAMES_FILENAME), np.asarray(frames, np.uint8))
+        np.save(
+            str(directory / cls.TIMESTAMPS_FILENAME), np.asarray(timestamps, np.float64)
+        )
+        if actions is not None:
+            np.save(
+                str(directory / cls.ACTIONS_FILENAME), np.asarray(actions, np.int64)
+            )
+
+
+class ReplayInputController:
+    """Accepts all input without sending it anywhere; only counts it."""
+
+    def __init__(self):
+        self.handled_keys = 0
+        self.pressed_keys = 0
+        self.released_keys = 0
+        self.clicks = 0
+
+    def handle_keys(self, keys):
+        self.handled_keys += 1
+
+    def press_key(self, key):
+        self.pressed_keys += 1
+
+    def release_key(self, key):
+        self.released_keys += 1
+
+    def click_screen_region(self, region):
+        self.clicks += 1
+
+
+class ReplayLDPlayer(LDPlayer):
+    def __init__(
+        self,
+        ldplayer_executable_filepath=None,
+        recording=None,
+        loop=True,
+        width=960,
+        height=540,
+        **kwargs
+    ):
+        """Replaces LDPlayer (and its executable) by frames of a recording.
+
+        Args:
+            ldplayer_executable_filepath (string): Ignored.
+            recording (string/Recording): Directory of the recording, or the recording
+                (or another object with frames and timestamps, like a
+                SyntheticRecording).
+            loop (bool): Restart at the first frame after the last one; otherwise
+                the last frame is repeated.
+            width (int): Ignored; the size of the recorded frames.
+            height (int): Ignored; the size of the recorded frames.
+        """
+        if isinstance(recording, (str, Path)):
+            recording = Recording(recording)
+        self.recording = recording
+        self._loop = loop
+        self._frame_index = 0
+        self._input_controller = ReplayInputController()
+
+        self._sprites = {}
+        self._regions = {}
+        self.sprites.update(
+            SPRITE_REGISTRY.discover(
+                Path(__file__).parent
+                / self.DATA_DIR
+                / self.LDPLAYER_DIR
+                / self.SPRITE_DIR
+            )
+        )
+
+    @property
+    def sprites(self):
+        return self._sprites
+
+    @property
+    def regions(self):
+        return self._regions
+
+    @property
+    def input_controller(self):
+        return self._input_controller
+
+    @property
+    def frame_index(self):
+        """int: Index in the recording of the next frame that is grabbed."""
+        return self._frame_index
+
+    def grab_frame(self):
+        """Returns the next frame of the recording.
+
+        Returns:
+            ReplayFrame: with the recorded image (read-only) and timestamp.
+        """
+        index = self._frame_index
+        if index + 1 < len(self.recording):
+            self._frame_index = index + 1
+        elif self._loop:
+            self._frame_index = 0
+
+        return ReplayFrame(
+            self.recording.frames[index], float(self.recording.timestamps[index])
+        )
+
+    def _wait_for_sprite(self, sprite, region=None, msg=None, **kwargs):
+        """Menus are not recorded, so every sprite is found in the next frame.
+
+        Returns:
+            tuple(bool, ReplayFrame, tuple): found, frame and location.
+        """
+        return True, self.grab_frame(), (0, 0)
+
+    def _locate_sprite(self, frame, sprite, region=None):
+        """Menus are not recorded, so every sprite is found (in its region)."""
+        return region or (0, 0, 0, 0)
+
+    def _wait_for_sprites(self, targets, timeout=None, msg=None):
+        """Menus are not recorded, so the first sprite is found in the next frame.
+
+        Returns:
+            tuple(Sprite, ReplayFrame, tuple): found sprite, frame and location.
+        """
+        sprite, region = targets[0]
+        return sprite, self.grab_frame(), region or (0, 0, 0, 0)
+
+
+def replay(game_class):
+    """Returns a variant of the given game class that replays a recording.
+
+    For example, ReplayTryBrawler = replay(TryBrawler) and then
+    ReplayTryBrawler(recording="path/to/recording", fps=1000).
+
+    Args:
+        game_class (type): Event that extends BrawlStars (and thus LDPlayer).
+
+    Returns:
+        type: Subclass of game_class in which LDPlayer is replaced by ReplayLDPlayer.
+    """
+
+    def __init__(self, recording, ldplayer_executable_filepath=None, **kwargs):
+        game_class.__init__(
+            self,
+            ldplayer_executable_filepath=ldplayer_executable_filepath,
+            recording=recording,
+            **kwargs
+        )
+
+    def _navigate(self, name, script):
+        """Menus are not recorded, so each navigation step takes the next frame."""
+        frame = self.grab_frame()
+        for _ in script[1:]:
+            frame = self.grab_frame()
+        return frame
+
+    return type(
+        "Replay" + game_class.__name__,
+        (game_class, ReplayLDPlayer),
+        {"__init__": __init__, "_navigate": _navigate},
+    )
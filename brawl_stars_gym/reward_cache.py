@@ -0,0 +1,85 @@
+from collections import OrderedDict
+from threading import Lock
+
+import numpy as np
+
+from brawl_stars_gym.digits import DigitReader
+
+"""
+Cache for rewards that are read from the screen, like the damage per second.
+
+The displayed number often stays the same for many consecutive frames, while
+the game behind it changes. So the key is the binarized text mask of the
+region of interest and not its raw pixels: unchanged digits hit the cache
+even when the (semi transparent) background has changed.
+
+"""
+
+
+class RewardCache:
+    """Least recently used cache of rewards; safe to use from several threads."""
+
+    def __init__(self, maxsize=128):
+        """
+        Args:
+            maxsize (int): Maximal number of cached rewards; least recently
+                used rewards are dropped first.
+        """
+        self._maxsize = maxsize
+        self._rewards = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(roi):
+        """Returns a compact key of the text in the region of interest (bytes)."""
+        mask = DigitReader.mask(roi)
+        return mask.shape + (np.packbits(mask).tobytes(),)
+
+    def get(self, roi, read):
+        """Returns the cached reward of the region of interest, or reads and caches it.
+
+        Args:
+            roi (np.ndarray): BGR image that contains only the reward text.
+            read (callable): Reads the reward from roi when it is not cached.
+
+        Returns:
+            Number: The reward.
+        """
+        key = self.key(roi)
+        with self._lock:
+            reward = self._rewards.get(key)
+            if reward is not None:
+                self._rewards.move_to_end(key)
+                self.hits += 1
+                return reward
+            self.misses += 1
+
+        reward = read(roi)
+        with self._lock:
+            self._rewards[key] = reward
+            if len(self._rewards) > self._maxsize:
+                self._rewards.popitem(last=False)
+        return reward
+
+    def clear(self):
+        """Drops all cached rewards and resets the counters."""
+        with self._lock:
+            self._rewards.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """Returns the hit/miss counters of the cache.
+
+        Returns:
+            dict: with hits, misses, hit_rate and size (number of cached rewards).
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._rewards),
+        }
@@ -0,0 +1,143 @@
+import random
+import time
+from collections import deque
+
+import numpy as np
+
+"""
+Fixed timestep scheduling of steps on monotonic deadlines, as a drop-in for the
+Limiter of game_control (start() and stop_and_delay()).
+
+The Limiter pauses relative to the start of each step, so the time that is
+spent outside of the step (and oversleeping) accumulates. Here step n is due
+at first_deadline + n / fps: a step that starts late is followed by a shorter
+pause, so the rate holds on average. When a step is late by more than a
+period, the schedule restarts from now, instead of rushing through the missed
+steps; the next step then still counts as late by that overrun.
+
+The jitter of a step is how late it starts after its deadline. In auto mode
+the fps is tuned every window of steps: lowered while the p95 jitter exceeds
+target_jitter, and raised while it stays below half of it, between min_fps and
+max_fps, but never above what the p95 step cost sustains.
+
+"""
+
+
+class StepScheduler:
+    # Factors the fps is changed with in auto mode
+    DECREASE = 0.8
+    INCREASE = 1.1
+
+    def __init__(
+        self,
+        fps=2,
+        auto=False,
+        target_jitter=0.01,
+        min_fps=1,
+        max_fps=30,
+        window=50,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        """
+        Args:
+            fps (int/tuple): Requested number of steps per second; a tuple is a
+                random range to choose from per step (top value excluded). The
+                initial fps in auto mode.
+            auto (bool): Tune the fps to the highest that holds target_jitter.
+            target_jitter (float): p95 of the seconds steps start late, in auto mode.
+            min_fps (float): Lowest fps in auto mode.
+            max_fps (float): Highest fps in auto mode.
+            window (int): Number of steps the jitter and step cost are measured
+                over before the fps is tuned, in auto mode.
+            clock (callable): Monotonic clock (seconds).
+            sleep (callable): Sleeps the given seconds.
+        """
+        if auto and isinstance(fps, tuple):
+            raise ValueError("Auto fps needs an initial fps, not a range", fps)
+        self._fps = fps
+        self._auto = auto
+        self._target_jitter = target_jitter
+        self._min_fps = min_fps
+        self._max_fps = max_fps
+        self._clock = clock
+        self._sleep = sleep
+
+        self._jitters = deque(maxlen=window)
+        self._costs = deque(maxlen=window)
+        self._deadline = None
+        self._overrun = 0.0
+        self._started_at = None
+        # Seconds the last step started late, and the fps it was scheduled at
+        self.jitter = 0.0
+        self.step_fps = None
+
+    @property
+    def fps(self):
+        """int/float/tuple: Requested (or in auto mode the tuned) steps per second."""
+        return self._fps
+
+    def reset(self):
+        """Forgets the schedule; the next step is due when it starts."""
+        self._deadline = None
+        self._overrun = 0.0
+
+    def start(self):
+        """Marks the start of a step and measures its jitter."""
+        self._started_at = self._clock()
+        if self._deadline is None:
+            self._deadline = self._started_at
+        self.jitter = max(0.0, self._started_at - self._deadline) + self._overrun
+        self._overrun = 0.0
+
+    def stop_and_delay(self):
+        """Marks the end of a step; sleeps until the deadline of the next step.
+
+        Returns:
+            tuple(float, float, float): Start of the step (clock), its duration
+                and the pause after it (seconds), like Limiter.stop_and_delay().
+        """
+        stopped_at = self._clock()
+        step_duration = stopped_at - self._started_at
+        if self._auto:
+            self._tune(step_duration)
+
+        self.step_fps = self._step_fps()
+        period = 1.0 / self.step_fps
+        self._deadline += period
+        if stopped_at - self._deadline > period:
+            # Too late to catch up with; skip the missed steps, but remember how
+            # late the next step is, or auto mode would take it as on time
+            self._overrun = stopped_at - self._deadline
+            self._deadline = stopped_at
+
+        paused_duration = max(0.0, self._deadline - stopped_at)
+        if paused_duration:
+            self._sleep(paused_duration)
+        return self._started_at, step_duration, paused_duration
+
+    def _step_fps(self):
+        if isinstance(self._fps, tuple):
+            return random.randrange(*self._fps)
+        return self._fps
+
+    def _tune(self, step_duration):
+        """Adds the jitter and cost of a step; adapts the fps after every window."""
+        self._jitters.append(self.jitter)
+        self._costs.append(step_duration)
+        if len(self._jitters) < self._jitters.maxlen:
+            return
+
+        jitter = np.percentile(self._jitters, 95)
+        sustainable = 1.0 / max(np.percentile(self._costs, 95), 1e-6)
+        if jitter > self._target_jitter:
+            fps = self._fps * self.DECREASE
+        elif jitter <= self._target_jitter / 2:
+            fps = self._fps * self.INCREASE
+        else:
+            fps = self._fps
+        fps = min(fps, sustainable, self._max_fps)
+        self._fps = float(max(fps, self._min_fps))
+        # Measure the new fps from scratch
+        self._jitters.clear()
+        self._costs.clear()
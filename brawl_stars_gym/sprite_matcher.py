@@ -0,0 +1,139 @@
+import cv2
+import numpy as np
+
+from brawl_stars_gym.sprite_registry import SPRITE_REGISTRY
+
+"""
+Template matching of sprites in frames.
+
+Global searches (in the whole frame) are done coarse-to-fine: the sprite is
+first located in a downscaled image pyramid level and then refined in a small
+window of the full resolution image. Several sprites are checked against the
+same frame, so waiting for one of several menu transitions costs one capture
+per poll instead of one per sprite. The grayscale sprite images and their
+pyramid levels are shared by all matchers of the process.
+
+"""
+
+
+class SpriteMatcher:
+    MIN_COARSE_SIZE = 8
+
+    def __init__(self, threshold=0.9, levels=2):
+        """
+        Args:
+            threshold (float): Minimal normalized correlation of a match.
+            levels (int): Number of pyramid levels (halvings) of the coarse search.
+        """
+        self._threshold = threshold
+        self._levels = levels
+
+    @staticmethod
+    def _gray(img):
+        if img.ndim == 2:
+            return img
+        if img.shape[2] == 4:
+            return cv2.cvtColor(img, cv2.COLOR_BGRA2GRAY)
+        return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    @classmethod
+    def sprite_image(cls, sprite):
+        """Returns the (first) image of the sprite in grayscale; cached per sprite."""
+        return SPRITE_REGISTRY.derived(sprite, "gray", cls._derive_gray)
+
+    @classmethod
+    def _derive_gray(cls, sprite):
+        data = np.asarray(sprite.image_data)
+        if data.ndim == 4:
+            # (height, width, channels, images)
+            data = data[..., 0]
+        return np.ascontiguousarray(cls._gray(data[..., :3]))
+
+    @classmethod
+    def sprite_pyramid_level(cls, sprite, level):
+        """Returns the sprite image in grayscale, level times halved; cached per sprite."""
+        if not level:
+            return cls.sprite_image(sprite)
+        return SPRITE_REGISTRY.derived(
+            sprite,
+            ("pyramid", level),
+            lambda sprite: cv2.pyrDown(cls.sprite_pyramid_level(sprite, level - 1)),
+        )
+
+    def _match(self, img, template):
+        """Returns (score, (y, x)) of the best match of template in img."""
+        if img.shape[0] < template.shape[0] or img.shape[1] < template.shape[1]:
+            return -1.0, (0, 0)
+        scores = cv2.matchTemplate(img, template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, (x, y) = cv2.minMaxLoc(scores)
+        return score, (y, x)
+
+    def locate(self, img, sprite, region=None):
+        """Locates sprite in img, within region if given.
+
+        Args:
+            img (np.ndarray): BGR (or grayscale) image, typically of a frame.
+            sprite (Sprite): Sprite to locate.
+            region (tuple): (top, left, bottom, right) to search in; None searches
+                the whole image, coarse-to-fine.
+
+        Returns:
+            tuple: (top, left, bottom, right) of the sprite in img, or None when
+                it is not found.
+        """
+        template = self.sprite_image(sprite)
+        top, left = 0, 0
+        if region is not None:
+            top, left, bottom, right = region
+            img = img[top:bottom, left:right]
+        gray = self._gray(img)
+
+        if region is None:
+            score, (y, x) = self._locate_coarse_to_fine(gray, sprite)
+        else:
+            score, (y, x) = self._match(gray, template)
+
+        if score < self._threshold:
+            return None
+        height, width = template.shape
+        return (top + y, left + x, top + y + height, left + x + width)
+
+    def _locate_coarse_to_fine(self, gray, sprite):
+        template = self.sprite_image(sprite)
+        levels = self._levels
+        while levels and min(template.shape) >> levels < self.MIN_COARSE_SIZE:
+            levels -= 1
+        if not levels:
+            return self._match(gray, template)
+
+        coarse_img = gray
+        for _ in range(levels):
+            coarse_img = cv2.pyrDown(coarse_img)
+        coarse_template = self.sprite_pyramid_level(sprite, levels)
+        _, (y, x) = self._match(coarse_img, coarse_template)
+
+        # Refine in a window around the coarse location at full resolution
+        scale = 1 << levels
+        margin = 2 * scale
+        height, width = template.shape
+        window_top = max(0, y * scale - margin)
+        window_left = max(0, x * scale - margin)
+        window = gray[
+            window_top : y * scale + height + margin,
+            window_left : x * scale + width + margin,
+        ]
+        score, (y, x) = self._match(window, template)
+        return score, (window_top + y, window_left + x)
+
+    def locate_all(self, img, targets):
+        """Checks several sprites against the same image.
+
+        Args:
+            img (np.ndarray): BGR image, typically of a frame.
+            targets (iterable): (sprite, region) tuples; region may be None.
+
+        Returns:
+            list: Location (top, left, bottom, right) per target; None when not found.
+        """
+        gray = self._gray(img)
+        return [self.locate(gray, sprite, region) for sprite, region in targets]
@@ -0,0 +1,110 @@
+import threading
+from pathlib import Path
+
+import numpy as np
+from game_control.sprite import Sprite
+
+"""
+Process-wide registry of sprites, so their PNGs are read and decoded once per
+process instead of once per environment instance, and instances share the
+sprites (and images derived from them, like grayscale pyramids for matching).
+
+Optionally the decoded sprites are persisted in one packed .npz next to the
+package data, which is used as long as it is newer than the PNGs.
+
+"""
+
+
+class SpriteRegistry:
+    DATA_DIR = Path(__file__).parent / "data"
+    PACKED_FILEPATH = DATA_DIR / "sprites.npz"
+
+    def __init__(self, packed_filepath=PACKED_FILEPATH):
+        """
+        Args:
+            packed_filepath (Path): Packed sprites; used when present and up to date.
+        """
+        self._packed_filepath = Path(packed_filepath)
+        self._packed = None
+        self._sprites = {}
+        self._derived = {}
+        self._lock = threading.RLock()
+
+    def discover(self, directory):
+        """Returns the sprites in directory; decoded only on the first call.
+
+        Args:
+            directory (Path): Directory with sprite_<name>_<index>.png files.
+
+        Returns:
+            dict: Sprite per name; a new dict, but the sprites are shared.
+        """
+        key = self._key(directory)
+        with self._lock:
+            if key not in self._sprites:
+                sprites = self._unpack(key, directory)
+                if sprites is None:
+                    sprites = Sprite.discover_sprites(directory)
+                self._sprites[key] = sprites
+            return dict(self._sprites[key])
+
+    def derived(self, sprite, name, derive):
+        """Returns an artifact derived from sprite; derived only on the first call.
+
+        Args:
+            sprite (Sprite): Sprite the artifact is derived from.
+            name (hashable): Name of the artifact, e.g. ("pyramid", 2).
+            derive (callable): Derives the artifact from the sprite.
+        """
+        key = (sprite.name, name)
+        with self._lock:
+            if key not in self._derived:
+                self._derived[key] = derive(sprite)
+            return self._derived[key]
+
+    def _key(self, directory):
+        directory = Path(directory).resolve()
+        try:
+            return directory.relative_to(self.DATA_DIR.resolve()).as_posix()
+        except ValueError:
+            return directory.as_posix()
+
+    def _unpack(self, key, directory):
+        """Returns the sprites of directory from the packed file, if up to date."""
+        if self._packed is None:
+            self._packed = {}
+            if self._packed_filepath.exists():
+                with np.load(str(self._packed_filepath)) as packed:
+                    self._packed = {name: packed[name] for name in packed.files}
+
+        prefix = key + "/"
+        names = [name for name in self._packed if name.startswith(prefix)]
+        if not names:
+            return None
+        packed_at = self._packed_filepath.stat().st_mtime
+        if any(p.stat().st_mtime > packed_at for p in Path(directory).glob("*.png")):
+            return None
+
+        return {
+            name[len(prefix) :]: Sprite(
+                name[len(prefix) :], image_data=self._packed[name]
+            )
+            for name in names
+        }
+
+    def pack(self, directories, filepath=None):
+        """Packs the decoded sprites of the given directories in one .npz file.
+
+        Args:
+            directories (iterable): Sprite directories to pack.
+            filepath (Path): Packed file; defaults to the one of this registry.
+        """
+        packed = {}
+        for directory in directories:
+            key = self._key(directory)
+            for name, sprite in self.discover(directory).items():
+                packed[key + "/" + name] = np.asarray(sprite.image_data)
+        np.savez(str(filepath or self._packed_filepath), **packed)
+
+
+SPRITE_REGISTRY = SpriteRegistry()
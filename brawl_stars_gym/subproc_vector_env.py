@@ -0,0 +1,306 @@
+import multiprocessing
+import os
+import time
+from multiprocessing.connection import wait
+
+import numpy as np
+
+from brawl_stars_gym.try_brawler import TryBrawler
+
+"""
+Drives several Brawl Stars games, each in its own process, so a game that hangs
+(e.g. on a frozen LDPlayer) is isolated and can be terminated.
+
+Observations are not pickled through the pipes: every process writes its
+observations into its slots of shared memory (multiprocessing.shared_memory,
+Python 3.8+), sized from the observation space of the game. Only actions,
+rewards, done flags and info go over the pipes.
+
+The shared memory has two slots per instance: the batch that step() returns,
+and one that resets write their first observation into, as resets run
+asynchronously; it is copied into the batch when the reset has finished.
+
+"""
+
+
+def _space_layout(space):
+    """Returns (shape, dtype) per key of a (Dict) space; key None for a Box."""
+    if hasattr(space, "spaces"):
+        return {key: (s.shape, s.dtype.str) for key, s in space.spaces.items()}
+    return {None: (space.shape, space.dtype.str)}
+
+
+def _slab(memory, shape, dtype, num_envs):
+    """Returns the (2, num_envs) + shape array in shared memory."""
+    return np.ndarray((2, num_envs) + tuple(shape), dtype, buffer=memory.buf)
+
+
+def _write(slots, observation):
+    if None in slots:
+        np.copyto(slots[None], observation)
+    else:
+        for key, slot in slots.items():
+            np.copyto(slot, observation[key])
+
+
+def _run_instance(pipe, game_class, kwargs):
+    """Runs a game in a worker process; serves the commands of the parent."""
+    from multiprocessing import shared_memory
+
+    memories = {}
+    game = None
+    try:
+        game = game_class(**kwargs)
+        layout = _space_layout(game.observation_space)
+        pipe.send(("spaces", (layout, game.actions)))
+
+        _, (names, index, num_envs) = pipe.recv()
+        memories = {
+            key: shared_memory.SharedMemory(name=name) for key, name in names.items()
+        }
+        slabs = {
+            key: _slab(memories[key], shape, dtype, num_envs)
+            for key, (shape, dtype) in layout.items()
+        }
+        step_slots = {key: slab[0, index] for key, slab in slabs.items()}
+        reset_slots = {key: slab[1, index] for key, slab in slabs.items()}
+
+        while True:
+            command, argument = pipe.recv()
+            if command == "step":
+                observation, reward, done, info = game.step(argument)
+                _write(step_slots, observation)
+                pipe.send(("step", (reward, done, info)))
+            elif command == "reset":
+                _write(reset_slots, game.reset())
+                pipe.send(("reset", None))
+            else:
+                break
+    except Exception as e:
+        # Report to the parent instead of letting it wait for an answer
+        pipe.send(("error", repr(e)))
+    finally:
+        if game is not None:
+            game.close()
+        for memory in memories.values():
+            memory.close()
+        pipe.close()
+
+
+class BrawlStarsSubprocVectorEnv:
+    # Seconds close() waits for an instance to stop before terminating it
+    CLOSE_TIMEOUT = 5
+
+    def __init__(
+        self, instance_kwargs, game_class=TryBrawler, timeout=None, context=None
+    ):
+        """Starts all instances, each in a process; returns when all are started.
+
+        Args:
+            instance_kwargs (list): Keyword arguments (dict) of game_class per instance,
+                like the ones of the registered BrawlStarsTryBrawler-v0 environment.
+            game_class (type): BrawlStars event to play, e.g. TryBrawler.
+            timeout (float): Seconds to wait for an instance to start, step or
+                reset before a RuntimeError is raised; None waits forever.
+            context (string): multiprocessing start method; None uses the default.
+        """
+        from multiprocessing import shared_memory
+
+        self.num_envs = len(instance_kwargs)
+        self._timeout = timeout
+        ctx = multiprocessing.get_context(context)
+        if os.name == "posix":
+            # Workers then share the resource tracker of this process, instead of
+            # starting their own, which would unlink the shared memory when they
+            # end (bpo-39959)
+            from multiprocessing import resource_tracker
+
+            resource_tracker.ensure_running()
+        self._pipes = []
+        self._processes = []
+        for kwargs in instance_kwargs:
+            pipe, child_pipe = ctx.Pipe()
+            process = ctx.Process(
+                target=_run_instance,
+                args=(child_pipe, game_class, kwargs),
+                daemon=True,
+            )
+            process.start()
+            child_pipe.close()
+            self._pipes.append(pipe)
+            self._processes.append(process)
+
+        self._memories = {}
+        try:
+            started = [self._receive(index, "spaces") for index in range(self.num_envs)]
+            layout, self.actions = started[0]
+            if any(other != layout for other, _ in started[1:]):
+                raise ValueError("Instances have different observation spaces")
+
+            # Two slots (step and reset) per instance, per observation key
+            slabs = {}
+            for key, (shape, dtype) in layout.items():
+                nbytes = (
+                    2 * self.num_envs * int(np.prod(shape)) * np.dtype(dtype).itemsize
+                )
+                self._memories[key] = shared_memory.SharedMemory(
+                    create=True, size=max(nbytes, 1)
+                )
+                slabs[key] = _slab(self._memories[key], shape, dtype, self.num_envs)
+            names = {key: memory.name for key, memory in self._memories.items()}
+            for index, pipe in enumerate(self._pipes):
+                pipe.send(("attach", (names, index, self.num_envs)))
+        except Exception:
+            self.close()
+            raise
+
+        if None in slabs:
+            self._observations = slabs[None][0]
+            self._reset_observations = slabs[None][1]
+        else:
+            self._observations = {key: slab[0] for key, slab in slabs.items()}
+            self._reset_observations = {key: slab[1] for key, slab in slabs.items()}
+        self._resetting = [False] * self.num_envs
+
+    def _receive(self, index, expected):
+        """Returns the answer of instance index to the expected command.
+
+        Raises:
+            RuntimeError: when the instance failed or did not answer in time
+        """
+        pipe = self._pipes[index]
+        if not pipe.poll(self._timeout):
+            raise RuntimeError("Instance", index, "did not answer in time")
+        try:
+            answer, result = pipe.recv()
+        except EOFError:
+            raise RuntimeError("Instance", index, "stopped")
+        if answer == "error":
+            raise RuntimeError("Instance", index, "failed", result)
+        if answer != expected:
+            raise RuntimeError("Instance", index, "answered", answer, expected)
+        return result
+
+    def reset(self):
+        """Resets all instances concurrently; returns when all are reset.
+
+        Returns:
+            np.ndarray: (N,) + observation_shape batch of first observations
+                (a dict of batches for Dict observation spaces), in shared memory.
+
+        Raises:
+            RuntimeError: when instances did not reset within the timeout
+        """
+        self.reset_async(range(self.num_envs))
+        self.reset_wait()
+        return self._observations
+
+    def reset_async(self, indices):
+        """Starts resetting the given instances; does not wait for them."""
+        for index in indices:
+            if not self._resetting[index]:
+                self._pipes[index].send(("reset", None))
+                self._resetting[index] = True
+
+    def reset_wait(self, timeout=None):
+        """Waits for the pending resets.
+
+        Args:
+            timeout (float): Maximal seconds to wait; None waits the timeout that
+                was given to the constructor and raises when it expires.
+
+        Returns:
+            list: Indices of the instances that are still resetting.
+
+        Raises:
+            RuntimeError: when, without a timeout given, instances did not reset
+                in time
+        """
+        raise_on_timeout = timeout is None
+        if raise_on_timeout:
+            timeout = self._timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self._collect_resets()
+        while any(self._resetting):
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            wait(
+                [p for p, r in zip(self._pipes, self._resetting) if r],
+                timeout=remaining,
+            )
+            self._collect_resets()
+        resetting = [index for index, r in enumerate(self._resetting) if r]
+        if resetting and raise_on_timeout:
+            raise RuntimeError("Instances", resetting, "did not reset in time")
+        return resetting
+
+    def _collect_resets(self):
+        """Copies first observations of finished resets; these instances are ready."""
+        for index, pipe in enumerate(self._pipes):
+            if self._resetting[index] and pipe.poll():
+                self._receive(index, "reset")
+                self._resetting[index] = False
+                if isinstance(self._observations, dict):
+                    for key, batch in self._observations.items():
+                        batch[index] = self._reset_observations[key][index]
+                else:
+                    self._observations[index] = self._reset_observations[index]
+
+    def step(self, actions):
+        """Steps all ready instances concurrently; does not wait for resetting ones.
+
+        Behaves like BrawlStarsVectorEnv.step(): an instance that is done is reset
+        asynchronously, until then its action is ignored and info["ready"] is False.
+
+        Args:
+            actions (sequence): Action per instance (see BrawlStars.step()).
+
+        Returns:
+            tuple(np.ndarray, np.ndarray, np.ndarray, list): with respectively
+                * (N,) + observation_shape batch of next observations (a dict
+                  of batches for Dict observation spaces), in shared memory;
+                  overwritten by the next step,
+                * the rewards,
+                * if each game is done or not,
+                * info (dict) per instance.
+        """
+        self._collect_resets()
+
+        stepping = []
+        for index, action in enumerate(actions):
+            if not self._resetting[index]:
+                self._pipes[index].send(("step", action))
+                stepping.append(index)
+
+        rewards = np.zeros(self.num_envs, dtype=np.float64)
+        dones = np.zeros(self.num_envs, dtype=bool)
+        infos = [{"ready": False} for _ in range(self.num_envs)]
+        for index in stepping:
+            rewards[index], dones[index], info = self._receive(index, "step")
+            infos[index] = dict(info, ready=True)
+
+        self.reset_async(np.flatnonzero(dones))
+
+        return self._observations, rewards, dones, infos
+
+    def close(self):
+        """Stops the instances (terminating the ones that do not stop in time)
+        and frees the shared memory; returned observation batches are then invalid.
+        """
+        for pipe in self._pipes:
+            try:
+                pipe.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(self.CLOSE_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        for pipe in self._pipes:
+            pipe.close()
+        for memory in self._memories.values():
+            memory.close()
+            memory.unlink()
+        self._memories = {}
@@ -0,0 +1,151 @@
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from brawl_stars_gym.digits import DigitReader
+from brawl_stars_gym.try_brawler import TryBrawler
+
+"""
+Synthetic frames with a known damage per second, to benchmark and fuzz reward
+extraction (and the whole step pipeline) at scale, without a running game.
+
+The damage is rendered in the text colour of the game at the position of the
+damage counter, with a slightly varying font, scale and offset, on a
+background that is sampled from the given crops (e.g. fixture regions without
+text). Frames are rendered lazily when indexed, so a SyntheticRecording can be
+replayed directly (replay(TryBrawler)(recording=SyntheticRecording(...))), or
+saved as a memory-mapped recording.
+
+"""
+
+
+class SyntheticRecording:
+    FONTS = (cv2.FONT_HERSHEY_SIMPLEX, cv2.FONT_HERSHEY_DUPLEX)
+    SCALES = (0.5, 0.6)
+    DAMAGE_FILENAME = "damage.npy"
+
+    def __init__(
+        self,
+        length,
+        backgrounds=None,
+        max_damage=3000,
+        zero_fraction=0.2,
+        fps=2,
+        seed=0,
+    ):
+        """
+        Args:
+            length (int): Number of frames.
+            backgrounds (sequence): BGR images (of any size, without text) that the
+                background of the damage counter is cropped from; None uses noise.
+            max_damage (int): Maximal damage per second.
+            zero_fraction (float): Fraction of frames without damage (no text).
+            fps (float): Frames per second of the timestamps.
+            seed (int): Seed; equal seeds give equal frames.
+        """
+        rng = np.random.default_rng(seed)
+        self._seed = seed
+        self.damage = rng.integers(1, max_damage + 1, length)
+        self.damage[rng.random(length) < zero_fraction] = 0
+        self.timestamps = np.arange(length) / fps
+        self.actions = None
+        self.frames = _LazyFrames(self)
+
+        self._region = TryBrawler.TRY_BRAWLER_REGIONS["REWARD_TRY_DAMAGE_PER_SECOND"]
+        top, left, bottom, right = self._region
+        if backgrounds is None:
+            backgrounds = [rng.integers(0, 100, (bottom - top, right - left, 3))]
+        self._backgrounds = [np.asarray(b, np.uint8) for b in backgrounds]
+        # The rest of the frame is the same for all frames
+        self._frame = rng.integers(0, 256, (540, 960, 3), dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.damage)
+
+    def render(self, index, out=None):
+        """Renders frame index.
+
+        Args:
+            index (int): Index of the frame.
+            out (np.ndarray): (540, 960, 3) uint8 array to render into; None allocates.
+
+        Returns:
+            np.ndarray: The BGR frame.
+        """
+        rng = np.random.default_rng((self._seed, index))
+        frame = self._frame.copy() if out is None else out
+        if out is not None:
+            np.copyto(frame, self._frame)
+
+        top, left, bottom, right = self._region
+        height, width = bottom - top, right - left
+        background = self._backgrounds[rng.integers(len(self._backgrounds))]
+        y = rng.integers(max(1, background.shape[0] - height + 1))
+        x = rng.integers(max(1, background.shape[1] - width + 1))
+        crop = background[y : y + height, x : x + width]
+        roi = frame[top:bottom, left:right]
+        if crop.shape[:2] != (height, width):
+            crop = cv2.resize(crop, (width, height))
+        roi[:] = crop
+
+        damage = int(self.damage[index])
+        if damage:
+            text = str(damage)
+            font = self.FONTS[rng.integers(len(self.FONTS))]
+            scale = rng.uniform(*self.SCALES)
+            (text_width, text_height), _ = cv2.getTextSize(text, font, scale, 1)
+            # Shrink text that would not fit the counter
+            scale *= min(1.0, (width - 2) / text_width, (height - 4) / text_height)
+            (text_width, text_height), _ = cv2.getTextSize(text, font, scale, 1)
+            origin = (
+                int(rng.integers(1, max(2, width - text_width))),
+                int(rng.integers(text_height + 1, height - 1)),
+            )
+            color = tuple(int(c) for c in DigitReader.TEXT_COLOR_BGR)
+            cv2.putText(roi, text, origin, font, scale, color, 1, cv2.LINE_8)
+        return frame
+
+    def __iter__(self):
+        """Yields (frame, damage) tuples; the frame buffer is reused."""
+        frame = np.empty_like(self._frame)
+        for index in range(len(self)):
+            yield self.render(index, out=frame), int(self.damage[index])
+
+    def save(self, directory, chunk_size=256):
+        """Saves the frames as a (memory-mapped) Recording, with a damage.npy.
+
+        Args:
+            directory (string): Directory of the recording.
+            chunk_size (int): Number of frames that are rendered per write.
+        """
+        from brawl_stars_gym.replay import Recording
+
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        frames = np.lib.format.open_memmap(
+            str(directory / Recording.FRAMES_FILENAME),
+            mode="w+",
+            dtype=np.uint8,
+            shape=(len(self),) + self._frame.shape,
+        )
+        for start in range(0, len(self), chunk_size):
+            for index in range(start, min(start + chunk_size, len(self))):
+                self.render(index, out=frames[index])
+            frames.flush()
+        del frames
+        np.save(str(directory / Recording.TIMESTAMPS_FILENAME), self.timestamps)
+        np.save(str(directory / self.DAMAGE_FILENAME), self.damage)
+
+
+class _LazyFrames:
+    """Frames of a SyntheticRecording, rendered when indexed."""
+
+    def __init__(self, recording):
+        self._recording = recording
+
+    def __len__(self):
+        return len(self._recording)
+
+    def __getitem__(self, index):
+        return self._recording.render(index)
@@ -2,13 +2,18 @@ from datetime import datetime
 from pathlib import Path
 from re import sub
 
-import cv2
 import numpy as np
 import pytesseract
-from game_control.sprite import Sprite
 from game_control.utilities import extract_roi_from_image
 
 from brawl_stars_gym.brawl_stars import BrawlStars
+from brawl_stars_gym.digits import DigitReader
+from brawl_stars_gym.hud import HudFeature
+from brawl_stars_gym.navigation import NavigationStep
+from brawl_stars_gym.profiler import profile_phase
+from brawl_stars_gym.reward_cache import RewardCache
+from brawl_stars_gym.sprite_registry import SPRITE_REGISTRY
+from brawl_stars_gym.text_preprocessor import TextImagePreprocessor
 
 """
 Extends BrawlStars game with event specific stuff,
@@ -20,18 +25,93 @@ if the episode is done.
 
 class TryBrawler(BrawlStars):
     TRY_BRAWLER_DIR = Path("try_brawler")
+    REWARD_BACKENDS = ("template", "tesseract")
+    # top, left, bottom, right
+    TRY_BRAWLER_REGIONS = {
+        "BUTTON_SHELLY": (100, 134, 304, 341),
+        "BUTTON_TRY": (485, 44, 523, 234),
+        "BUTTON_EXIT": (494, 520, 508, 543),
+        # "BUTTON_PLAY": (459, 686, 516, 886),
+        "REWARD_TRY_DAMAGE_PER_SECOND": (67, 848, 89, 900),
+    }
+    HUD_FEATURES = BrawlStars.HUD_FEATURES + (
+        HudFeature(
+            "damage_counter",
+            TRY_BRAWLER_REGIONS["REWARD_TRY_DAMAGE_PER_SECOND"],
+            tuple(DigitReader.TEXT_COLOR_BGR),
+            15,
+            "columns",
+            1,
+        ),
+    )
+    TESSERACT_CONFIG = r"--oem 1 --psm 6 outputbase digits"
+    # Maximal number of regions of interest that are read in one Tesseract call
+    OCR_BATCH_SIZE = 64
+
+    # Menu navigation: (region_name, click, expected_latency) steps
+    START_EVENT_SCRIPT = (
+        NavigationStep("BUTTON_BRAWLERS", True, 0.0),
+        NavigationStep("BUTTON_SHELLY", True, 1.0),
+        NavigationStep("BUTTON_TRY", True, 1.0),
+        NavigationStep("BUTTON_EXIT", False, 2.0),
+    )
+    STOP_EVENT_SCRIPT = (
+        NavigationStep("BUTTON_EXIT", True, 0.0),
+        NavigationStep("BUTTON_BACK", True, 2.0),
+        NavigationStep("BUTTON_BACK", True, 1.0),
+    )
+    RESET_SCRIPT = (
+        NavigationStep("BUTTON_EXIT", True, 0.0),
+        NavigationStep("BUTTON_TRY", True, 2.0),
+        NavigationStep("BUTTON_EXIT", False, 2.0),
+    )
+
+    def __init__(
+        self,
+        episode_duration_in_seconds=10,
+        brawler="Shelly",
+        reward_backend=None,
+        reward_cache_size=128,
+        digit_reader=None,
+        **kwargs
+    ):
+        """Starts this Brawl Stars event; returns when event is started.
 
-    def __init__(self, episode_duration_in_seconds=10, brawler="Shelly", **kwargs):
-        """Starts this Brawl Stars event; returns when event is started."""
+        Args:
+            episode_duration_in_seconds (int): Duration of an episode.
+            brawler (string): Brawler to try; only "Shelly" for now.
+            reward_backend (string): How the damage per second is read, one of
+                REWARD_BACKENDS. "template" matches digit templates and falls back
+                to Tesseract when a digit can not be matched (or templates are missing).
+                None uses "template" when digit_reader is given or the digit
+                templates are bundled, and "tesseract" otherwise.
+            reward_cache_size (int): Number of recently read rewards that are cached
+                by their binarized text; unchanged digits skip OCR. 0 disables the cache.
+            digit_reader (DigitReader): Reader of the "template" backend; None uses
+                the bundled templates (DigitReader.default()).
+        """
         if brawler != "Shelly":
             raise NotImplementedError("Only Shelly implemented for now")
+        if reward_backend is None:
+            reward_backend = (
+                "template"
+                if digit_reader is not None or DigitReader.has_default()
+                else "tesseract"
+            )
+        if reward_backend not in self.REWARD_BACKENDS:
+            raise ValueError("Unknown reward backend", reward_backend)
         print("episode_duration_in_seconds=", episode_duration_in_seconds)
         self._episode_duration_in_seconds = episode_duration_in_seconds
+        self._reward_backend = reward_backend
+        self._digit_reader = digit_reader
+        self._reward_cache = (
+            RewardCache(reward_cache_size) if reward_cache_size else None
+        )
 
         super().__init__(**kwargs)
 
         self.sprites.update(
-            Sprite.discover_sprites(
+            SPRITE_REGISTRY.discover(
                 Path(__file__).parent
                 / self.DATA_DIR
                 / self.TRY_BRAWLER_DIR
@@ -39,15 +119,7 @@ class TryBrawler(BrawlStars):
             )
         )
 
-        self._regions.update(
-            {
-                "BUTTON_SHELLY": (100, 134, 304, 341),
-                "BUTTON_TRY": (485, 44, 523, 234),
-                "BUTTON_EXIT": (494, 520, 508, 543),
-                # "BUTTON_PLAY": (459, 686, 516, 886),
-                "REWARD_TRY_DAMAGE_PER_SECOND": (67, 848, 89, 900),
-            }
-        )
+        self._regions.update(self.TRY_BRAWLER_REGIONS)
 
         self.start_event()
 
@@ -60,19 +132,7 @@ class TryBrawler(BrawlStars):
         Raises:
             RuntimeError: when event could not be started
         """
-        region_names = ("BUTTON_BRAWLERS", "BUTTON_SHELLY", "BUTTON_TRY", "BUTTON_EXIT")
-        clicks = (True, True, True, False)
-        for region_name, click in zip(region_names, clicks):
-            sprite = self.sprites["SPRITE_" + region_name]
-            region = self.regions[region_name]
-            found, frame, _ = self._wait_for_sprite(
-                sprite, region=region, msg="Waiting for " + region_name
-            )
-            if not found:
-                raise RuntimeError("Could not find sprite", sprite.name, "in time")
-
-            if click:
-                self.input_controller.click_screen_region(region)
+        frame = self._navigate("start_event", self.START_EVENT_SCRIPT)
 
         self._started_at = datetime.utcnow()
 
@@ -84,19 +144,7 @@ class TryBrawler(BrawlStars):
         Returns:
             Frame: First frame when arrived at main screen
         """
-        region_names = ("BUTTON_EXIT", "BUTTON_BACK", "BUTTON_BACK")
-        clicks = (True, True, True)
-        for region_name, click in zip(region_names, clicks):
-            sprite = self.sprites["SPRITE_" + region_name]
-            region = self.regions[region_name]
-            found, frame, _ = self._wait_for_sprite(
-                sprite, region=region, msg="Waiting for " + region_name
-            )
-            if not found:
-                raise RuntimeError("Could not find sprite", sprite.name, "in time")
-
-            if click:
-                self.input_controller.click_screen_region(region)
+        frame = self._navigate("stop_event", self.STOP_EVENT_SCRIPT)
 
         return frame
 
@@ -106,70 +154,159 @@ class TryBrawler(BrawlStars):
         Returns:
             Frame: First frame when event has started
         """
-        region_names = ("BUTTON_EXIT", "BUTTON_TRY", "BUTTON_EXIT")
-        clicks = (True, True, False)
-        for region_name, click in zip(region_names, clicks):
-            sprite = self.sprites["SPRITE_" + region_name]
-            region = self.regions[region_name]
-            found, frame, _ = self._wait_for_sprite(
-                sprite, region=region, msg="Waiting for " + region_name
-            )
-            if not found:
-                raise RuntimeError("Could not find sprite", sprite.name, "in time")
+        self._new_episode()
 
-            if click:
-                self.input_controller.click_screen_region(region)
+        frame = self._navigate("reset", self.RESET_SCRIPT)
 
         self._started_at = datetime.utcnow()
 
         return self.observation(frame)
 
+    @property
+    def reward_cache(self):
+        """RewardCache: Cache of read rewards (with hit/miss counters) or None."""
+        return self._reward_cache
+
     @staticmethod
-    def _preprocess_text_image(img):
+    def _preprocess_text_image(img, mask_first=True):
         """Converts image to a binary image where text is black on a white background.
 
         Args:
             img (np.ndarray): Image with reward text in BGR format;
                 typically the region of interest of the full frame that contains the reward.
+            mask_first (bool): Mask the text colour before upscaling (faster);
+                see TextImagePreprocessor.
 
         Returns:
             np.ndarray: Preprocessed image with black reward text on white background.
+                It is a buffer that the next call (in this thread) overwrites.
 
         """
-        text_color_bgr = np.array([255, 136, 136])
-        text_color_bgr_dev = np.array([15] * 3)
-
-        img = cv2.resize(img, (0, 0), fx=5, fy=5)
-        img = cv2.inRange(
-            img,
-            text_color_bgr - text_color_bgr_dev,
-            text_color_bgr + text_color_bgr_dev,
-        )
-        img = cv2.bitwise_not(img)
-        img = cv2.blur(img, (2, 2))
-
-        return img
+        return TextImagePreprocessor.for_shape(img.shape, mask_first)(img)
 
     @staticmethod
-    def damage_per_second(roi):
+    def damage_per_second(roi, backend="template", profiler=None, reader=None):
         """Extracts and returns the number in the given region of interest image.
         This number represents the damage per second that is displayed in this event.
 
         Args:
             roi (np.ndarray): The extracted region of interest of the full game frame
                 that contains only the numbers to be extracted.
+            backend (string): One of REWARD_BACKENDS; "template" falls back to
+                "tesseract" when the digits can not be matched.
+            profiler (StepProfiler): Times the OCR phases, when given.
+            reader (DigitReader): Reader of the "template" backend; None uses
+                DigitReader.default().
 
         Returns:
             Int: The extracted number representing the inflicted damage per second.
 
         """
-        roi = TryBrawler._preprocess_text_image(roi)
-        custom_config = r"--oem 1 --psm 6 outputbase digits"
-        reward = pytesseract.image_to_string(roi, config=custom_config)
+        if backend == "template":
+            with profile_phase(profiler, "ocr_template"):
+                reader = reader or DigitReader.default()
+                reward = reader.read(roi) if reader else None
+            if reward is not None:
+                return reward
+
+        return TryBrawler._damage_per_second_tesseract(roi, profiler)
+
+    @staticmethod
+    def _damage_per_second_tesseract(roi, profiler=None, mask_first=True):
+        """Extracts the damage per second with Tesseract OCR (slow, but robust)."""
+        with profile_phase(profiler, "ocr_preprocess"):
+            roi = TryBrawler._preprocess_text_image(roi, mask_first)
+        with profile_phase(profiler, "ocr_tesseract"):
+            reward = pytesseract.image_to_string(
+                roi, config=TryBrawler.TESSERACT_CONFIG
+            )
         reward = sub(r"\D", "", reward)
 
         return 0 if not reward else int(reward)
 
+    @staticmethod
+    def damage_per_second_batch(rois, backend="template", profiler=None, reader=None):
+        """Extracts the damage per second of many regions of interest at once.
+
+        Regions that the template backend can not read are preprocessed, tiled
+        into one image (a line per region, separated by white space) and read with
+        a single Tesseract call per OCR_BATCH_SIZE regions. When Tesseract does not
+        return a line per region, those regions are read one by one.
+
+        Args:
+            rois (iterable): Regions of interest, like for damage_per_second.
+            backend (string): One of REWARD_BACKENDS.
+            profiler (StepProfiler): Times the OCR phases, when given.
+            reader (DigitReader): Reader of the "template" backend; None uses
+                DigitReader.default().
+
+        Returns:
+            list: The damage per second (int) per region of interest.
+        """
+        rois = list(rois)
+        rewards = [None] * len(rois)
+        if backend == "template":
+            with profile_phase(profiler, "ocr_template"):
+                reader = reader or DigitReader.default()
+                if reader:
+                    rewards = [reader.read(roi) for roi in rois]
+
+        unread = [i for i, reward in enumerate(rewards) if reward is None]
+        for start in range(0, len(unread), TryBrawler.OCR_BATCH_SIZE):
+            indices = unread[start : start + TryBrawler.OCR_BATCH_SIZE]
+            batch = TryBrawler._damage_per_second_tesseract_batch(
+                [rois[i] for i in indices], profiler
+            )
+            for i, reward in zip(indices, batch):
+                rewards[i] = reward
+
+        return rewards
+
+    @staticmethod
+    def _damage_per_second_tesseract_batch(rois, profiler=None):
+        """Reads the regions of interest with one Tesseract call on their tiling."""
+        with profile_phase(profiler, "ocr_preprocess"):
+            # Copied, as every call overwrites the buffer of the previous one
+            images = [TryBrawler._preprocess_text_image(roi).copy() for roi in rois]
+            # Regions without text yield no line, so they are not tiled
+            texts = [i for i, img in enumerate(images) if img.min() < 128]
+            if texts:
+                height = max(images[i].shape[0] for i in texts)
+                width = max(images[i].shape[1] for i in texts)
+                margin = height // 2
+                tiled = np.full(
+                    (len(texts) * (height + margin) + margin, width + 2 * margin),
+                    255,
+                    dtype=np.uint8,
+                )
+                for row, i in enumerate(texts):
+                    top = margin + row * (height + margin)
+                    img = images[i]
+                    tiled[top : top + img.shape[0], margin : margin + img.shape[1]] = (
+                        img
+                    )
+
+        rewards = [0] * len(rois)
+        if not texts:
+            return rewards
+
+        with profile_phase(profiler, "ocr_tesseract"):
+            text = pytesseract.image_to_string(
+                tiled, config=TryBrawler.TESSERACT_CONFIG
+            )
+        lines = [sub(r"\D", "", line) for line in text.splitlines()]
+        lines = [line for line in lines if line]
+
+        if len(lines) != len(texts):
+            # Lines were merged or lost; read the regions one by one instead
+            for i in texts:
+                rewards[i] = TryBrawler._damage_per_second_tesseract(rois[i], profiler)
+            return rewards
+
+        for i, line in zip(texts, lines):
+            rewards[i] = int(line)
+        return rewards
+
     def reward(self, frame):
         """Returns the reward of the previously performed action that resulted in the given Frame.
 
@@ -188,7 +325,14 @@ class TryBrawler(BrawlStars):
         reward_roi = self.regions["REWARD_TRY_DAMAGE_PER_SECOND"]
         region = extract_roi_from_image(frame.img, reward_roi)
 
-        return self.damage_per_second(region)
+        def read(roi):
+            return self.damage_per_second(
+                roi, self._reward_backend, self._profiler, self._digit_reader
+            )
+
+        if self._reward_cache is None:
+            return read(region)
+        return self._reward_cache.get(region, read)
 
     def done(self, frame):
         """Returns if the episode has finshed, when its time has passed.
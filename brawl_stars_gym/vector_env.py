@@ -0,0 +1,167 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import numpy as np
+from gym.spaces import Dict
+
+from brawl_stars_gym.try_brawler import TryBrawler
+
+"""
+Drives several Brawl Stars games (each in its own LDPlayer window) from one process.
+
+Every instance mostly waits: on the emulator in grab_frame() and
+_wait_for_sprite(), and in its limiter. So instances are stepped and reset
+concurrently on threads, while the (CPU bound) rewards of all instances are
+determined on one shared pool.
+
+"""
+
+
+class BrawlStarsVectorEnv:
+    def __init__(
+        self,
+        instance_kwargs,
+        game_class=TryBrawler,
+        reward_workers=None,
+        reward_deadline=None,
+    ):
+        """Starts all instances concurrently; returns when all are started.
+
+        Args:
+            instance_kwargs (list): Keyword arguments (dict) of game_class per instance,
+                like the ones of the registered BrawlStarsTryBrawler-v0 environment.
+            game_class (type): BrawlStars event to play, e.g. TryBrawler.
+            reward_workers (int): Number of workers of the shared reward pool;
+                defaults to the number of CPUs.
+            reward_deadline (float): Passed on to each instance; None delivers each
+                reward one step later (see BrawlStars), with a deadline the rewards
+                of the own frame are delivered when ready in time.
+        """
+        self.num_envs = len(instance_kwargs)
+        self._reward_executor = ThreadPoolExecutor(
+            max_workers=reward_workers or os.cpu_count()
+        )
+        self._executor = ThreadPoolExecutor(max_workers=self.num_envs)
+
+        futures = [
+            self._executor.submit(
+                game_class,
+                reward_executor=self._reward_executor,
+                reward_deadline=reward_deadline,
+                **kwargs
+            )
+            for kwargs in instance_kwargs
+        ]
+        self.games = [future.result() for future in futures]
+
+        self._observations = self._allocate(self.games[0].observation_space)
+        self._resets = [None] * self.num_envs
+
+    def _allocate(self, space):
+        """Returns a batch of zero observations (a dict of batches for a Dict)."""
+        if isinstance(space, Dict):
+            return {key: self._allocate(value) for key, value in space.spaces.items()}
+        return np.zeros((self.num_envs,) + space.shape, space.dtype)
+
+    def _store(self, index, observation, observations=None):
+        """Stores the observation of instance index in the batch."""
+        observations = self._observations if observations is None else observations
+        if isinstance(observations, dict):
+            for key, value in observations.items():
+                self._store(index, observation[key], value)
+        else:
+            observations[index] = observation
+
+    @property
+    def actions(self):
+        return self.games[0].actions
+
+    def reset(self):
+        """Resets all instances concurrently; returns when all are reset.
+
+        Returns:
+            np.ndarray: (N,) + observation_shape batch of first observations
+                (a dict of batches for Dict observation spaces).
+        """
+        self.reset_async(range(self.num_envs))
+        self.reset_wait()
+        return self._observations
+
+    def reset_async(self, indices):
+        """Starts resetting the given instances; does not wait for them."""
+        for index in indices:
+            if self._resets[index] is None:
+                self._resets[index] = self._executor.submit(self.games[index].reset)
+
+    def reset_wait(self, timeout=None):
+        """Waits for the pending resets.
+
+        Returns:
+            list: Indices of the instances that are still resetting.
+        """
+        pending = [future for future in self._resets if future is not None]
+        wait(pending, timeout=timeout)
+        self._collect_resets()
+        return [
+            index for index, future in enumerate(self._resets) if future is not None
+        ]
+
+    def _collect_resets(self):
+        """Stores first observations of finished resets; these instances are ready."""
+        for index, future in enumerate(self._resets):
+            if future is not None and future.done():
+                self._resets[index] = None
+                self._store(index, future.result())
+
+    def step(self, actions):
+        """Steps all ready instances concurrently; does not wait for resetting ones.
+
+        An instance that is done is reset asynchronously. Until its reset has
+        finished its action is ignored, its observation stays the last one, its
+        reward is 0 and info["ready"] is False.
+
+        Args:
+            actions (sequence): Action per instance (see BrawlStars.step()).
+
+        Returns:
+            tuple(np.ndarray, np.ndarray, np.ndarray, list): with respectively
+                * (N,) + observation_shape batch of next observations (a dict
+                  of batches for Dict observation spaces); overwritten by the
+                  next step,
+                * the rewards,
+                * if each game is done or not,
+                * info (dict) per instance.
+        """
+        self._collect_resets()
+
+        futures = {
+            index: self._executor.submit(self.games[index].step, action)
+            for index, action in enumerate(actions)
+            if self._resets[index] is None
+        }
+
+        rewards = np.zeros(self.num_envs, dtype=np.float64)
+        dones = np.zeros(self.num_envs, dtype=bool)
+        infos = [{"ready": False} for _ in range(self.num_envs)]
+        for index, future in futures.items():
+            observation, rewards[index], dones[index], info = future.result()
+            self._store(index, observation)
+            infos[index] = dict(info, ready=True)
+
+        self.reset_async(np.flatnonzero(dones))
+
+        return self._observations, rewards, dones, infos
+
+    def close(self):
+        """Stops the worker threads and closes the games.
+
+        Does not wait for pending resets, as an instance that hangs would block it;
+        an instance that is still resetting is closed when its reset has finished.
+        """
+        self._executor.shutdown(wait=False)
+        self._reward_executor.shutdown()
+        for game, future in zip(self.games, self._resets):
+            if future is None:
+                game.close()
+            else:
+                future.add_done_callback(lambda _, game=game: game.close())
@@ -23,15 +23,13 @@ test_requirements = [
 setup(
     author="Research 2 use",
     author_email="research2use@hotmail.com",
-    python_requires=">=3.5",
+    python_requires=">=3.7",
     classifiers=[
         "Development Status :: 2 - Pre-Alpha",
         "Intended Audience :: Developers",
         "License :: OSI Approved :: MIT License",
         "Natural Language :: English",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.5",
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
     ],
@@ -45,6 +43,7 @@ setup(
     license="MIT license",
     long_description=readme + "\n\n" + history,
     include_package_data=True,
+    package_data={"brawl_stars_gym": ["data/*/*/*.png", "data/*.npz"]},
     keywords="brawl_stars_gym",
     name="brawl_stars_gym",
     packages=find_packages(include=["brawl_stars_gym", "brawl_stars_gym.*"]),
@@ -0,0 +1,156 @@
+import time
+from collections import namedtuple
+from pathlib import Path
+
+import cv2
+
+from brawl_stars_gym.digits import DigitReader
+from brawl_stars_gym.replay import replay
+from brawl_stars_gym.try_brawler import TryBrawler
+
+"""
+Labelled fixtures of the try brawler event, shared by the tests and the
+benchmarks: regions of interest of the damage per second counter (BGR PNGs in
+tests/data) with the damage per second they display.
+
+The bundled digit templates are built from DIGIT_TEMPLATE_CASES only (every
+digit occurs in them), so they are tested on HELD_OUT_CASES. Rebuild them
+from a checkout with the Git LFS content of the fixtures:
+
+    python -m tests.fixtures
+
+"""
+
+DATA_DIR = Path(__file__).parent / "data"
+
+DAMAGE_PER_SECOND_CASES = [
+    ("region_1615323288.933967.png", 1104),
+    ("region_1615323287.451309.png", 1104),
+    ("region_1615323285.9551656.png", 690),
+    ("region_1615323282.927077.png", 345),
+    ("region_1615323281.4278924.png", 0),
+    ("region_1615323279.9353352.png", 0),
+    ("region_1615323278.4275265.png", 0),
+    ("region_1615323276.8998601.png", 0),
+    ("region_1615323275.4353292.png", 345),
+    ("region_1615323273.9144456.png", 345),
+    ("region_1615323272.4369917.png", 0),
+    ("region_1615323270.9134169.png", 1188),
+    ("region_1615323269.429769.png", 1215),
+    ("region_1615323267.9092262.png", 1564),
+    ("region_1615323266.4272156.png", 2415),
+    ("region_1615323264.9300942.png", 345),
+    ("region_1615323263.4112701.png", 790),
+    ("region_1615323261.890822.png", 1473),
+    ("region_1615323260.4179654.png", 2176),
+    ("region_1615323258.9119284.png", 1847),
+    ("region_1615323257.4330688.png", 2727),
+    ("region_1615323255.900718.png", 2008),
+    ("region_1615323254.388059.png", 2321),
+    ("region_1615323252.9088092.png", 1571),
+    ("region_1615323251.4210038.png", 803),
+    ("region_1615323249.912249.png", 948),
+    ("region_1615323248.3961856.png", 1436),
+    ("region_1615323246.9156165.png", 1573),
+    ("region_1615323245.4008174.png", 995),
+    ("region_1615323243.9200182.png", 1327),
+    ("region_1615323242.4288852.png", 854),
+    ("region_1615323240.921151.png", 1405),
+    ("region_1615323239.4166396.png", 1533),
+    ("region_1615323237.9028618.png", 1035),
+    ("region_1615323236.4090006.png", 0),
+    ("region_1615323234.914815.png", 0),
+]
+
+DIGIT_TEMPLATE_CASES = DAMAGE_PER_SECOND_CASES[::2]
+HELD_OUT_CASES = DAMAGE_PER_SECOND_CASES[1::2]
+
+
+def read_image(image_filename):
+    """Returns the BGR image of a fixture; None when it can not be read."""
+    return cv2.imread(str(DATA_DIR / image_filename))
+
+
+def damage_per_second_samples(cases=DAMAGE_PER_SECOND_CASES):
+    """Returns (roi, damage per second) tuples of the cases."""
+    return [
+        (read_image(image_filename), expected) for image_filename, expected in cases
+    ]
+
+
+class TimestampRewardTryBrawler(replay(TryBrawler)):
+    """Replayed TryBrawler without OCR: the reward of a frame is its timestamp.
+
+    Determining the reward takes reward_duration seconds, like reading it would,
+    and a reset takes reset_duration seconds, like navigating the menus would.
+    """
+
+    def __init__(self, recording, reward_duration=0.0, reset_duration=0.0, **kwargs):
+        self.reward_duration = reward_duration
+        self.reset_duration = reset_duration
+        super().__init__(recording, **kwargs)
+
+    def reset(self):
+        time.sleep(self.reset_duration)
+        return super().reset()
+
+    def reward(self, frame):
+        time.sleep(self.reward_duration)
+        return frame.timestamp
+
+
+class FakeMenuGame:
+    """Stand-in for a game in its menus, for navigation without an emulator.
+
+    The sprite of a region is visible once the latency of that region has passed
+    since the previous click. A frame is its timestamp; grabs and clicks are
+    logged as (event, time) in events.
+    """
+
+    FakeSprite = namedtuple("FakeSprite", ["name"])
+
+    def __init__(self, latencies):
+        """
+        Args:
+            latencies (dict): Seconds after the previous click until the sprite
+                of a region is visible, per region name.
+        """
+        self._latencies = latencies
+        self.sprites = {
+            "SPRITE_" + name: self.FakeSprite("SPRITE_" + name) for name in latencies
+        }
+        self.regions = {name: name for name in latencies}
+        self.input_controller = self
+        self.events = []
+        # The sprites of all regions are visible until the first click
+        self._clicked_at = float("-inf")
+
+    def grab_frame(self):
+        timestamp = time.monotonic()
+        self.events.append(("grab", timestamp))
+        return timestamp
+
+    def _locate_sprite(self, frame, sprite, region):
+        return frame - self._clicked_at >= self._latencies[region]
+
+    def click_screen_region(self, region):
+        self._clicked_at = time.monotonic()
+        self.events.append(("click", self._clicked_at))
+
+
+def build_digit_templates(directory=DigitReader.DIGITS_DIR):
+    """Builds the digit templates from DIGIT_TEMPLATE_CASES into directory.
+
+    Raises:
+        ValueError: when a fixture can not be read (e.g. a Git LFS pointer)
+    """
+    samples = damage_per_second_samples(DIGIT_TEMPLATE_CASES)
+    for (image_filename, _), (roi, _) in zip(DIGIT_TEMPLATE_CASES, samples):
+        if roi is None:
+            raise ValueError("Can not read fixture", str(DATA_DIR / image_filename))
+    DigitReader.from_samples(samples).save(directory)
+    print("Saved digit templates in", directory)
+
+
+if __name__ == "__main__":
+    build_digit_templates()
@@ -0,0 +1,40 @@
+import pytest
+from game_control.input_controller import KeyboardEvents, KeyboardKey
+
+from brawl_stars_gym.actions import HeldKeyActions
+from brawl_stars_gym.brawl_stars import BrawlStars
+
+
+def _transitions(events):
+    return [(event.event, event.keyboard_key) for event in events]
+
+
+def test_held_key_actions_send_only_changes():
+    actions = HeldKeyActions(BrawlStars.HELD_KEY_ACTIONS)
+    move_top_left_and_shoot = (5, 1)
+
+    assert actions.space.nvec.tolist() == [9, 3]
+    assert actions.names(move_top_left_and_shoot) == ("MOVE TOP-LEFT", "SHOOT")
+    assert _transitions(actions.events(move_top_left_and_shoot)) == [
+        (KeyboardEvents.DOWN, KeyboardKey.KEY_A),
+        (KeyboardEvents.DOWN, KeyboardKey.KEY_E),
+        (KeyboardEvents.DOWN, KeyboardKey.KEY_W),
+    ]
+    assert actions.events(move_top_left_and_shoot) == []
+    assert _transitions(actions.events((1, 1))) == [
+        (KeyboardEvents.UP, KeyboardKey.KEY_A)
+    ]
+    assert _transitions(actions.release()) == [
+        (KeyboardEvents.UP, KeyboardKey.KEY_E),
+        (KeyboardEvents.UP, KeyboardKey.KEY_W),
+    ]
+    assert actions.held == frozenset()
+
+
+def test_held_key_actions_index():
+    actions = HeldKeyActions(BrawlStars.HELD_KEY_ACTIONS)
+
+    indices = {actions.index((move, shoot)) for move in range(9) for shoot in range(3)}
+    assert indices == set(range(len(actions)))
+    with pytest.raises(ValueError):
+        actions.keys((1,))
@@ -0,0 +1,58 @@
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+import pytest
+
+from brawl_stars_gym.capture import FrameCapture
+
+Frame = namedtuple("Frame", ["img", "timestamp"])
+
+
+class _Grabber:
+    def __init__(self):
+        self.grabs = 0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.grabs += 1
+            grabs = self.grabs
+        time.sleep(0.001)
+        return Frame(np.full((4, 4, 3), grabs % 256, np.uint8), grabs)
+
+
+def test_frame_capture_pause_and_resume():
+    grab_frame = _Grabber()
+    capture = FrameCapture(grab_frame)
+    try:
+        frame, _ = capture.wait_for_frame(timeout=1)
+        assert frame is not None
+
+        capture.pause()
+        paused_at = grab_frame.grabs
+        time.sleep(0.05)
+        assert grab_frame.grabs == paused_at
+
+        capture.resume()
+        frame, _ = capture.wait_for_frame(timeout=1)
+        # Frames captured before the pause are not returned after it
+        assert frame.timestamp > paused_at
+    finally:
+        capture.stop()
+    assert not capture._thread.is_alive()
+
+
+def test_frame_capture_raises_grab_error():
+    def grab_frame():
+        raise OSError("Window is gone")
+
+    capture = FrameCapture(grab_frame)
+    try:
+        with pytest.raises(OSError):
+            capture.wait_for_frame()
+        with pytest.raises(OSError):
+            capture.pause()
+    finally:
+        capture.stop()
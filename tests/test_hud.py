@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from brawl_stars_gym.hud import HudFeature, HudFeatureExtractor
+
+FEATURES = (
+    HudFeature("health", (10, 10, 14, 70), (80, 200, 60), 50, "columns", 1),
+    HudFeature("ammo", (20, 10, 24, 70), (0, 150, 255), 50, "columns", 3),
+    HudFeature("super", (30, 10, 50, 30), (0, 210, 255), 50, "pixels", 1),
+)
+
+
+def test_hud_feature_extractor():
+    frame = np.zeros((540, 960, 3), dtype=np.uint8)
+    frame[10:14, 10:40] = (90, 210, 70)  # half health
+    frame[20:24, 10:50] = (0, 150, 255)  # two of three ammo
+    frame[30:40, 10:30] = (0, 210, 255)  # half super
+
+    extractor = HudFeatureExtractor(FEATURES)
+    features = extractor.extract(frame)
+
+    assert extractor.names == ["health", "ammo_0", "ammo_1", "ammo_2", "super"]
+    assert features.dtype == np.float32
+    assert features.tolist() == pytest.approx([0.5, 1.0, 1.0, 0.0, 0.5])
+
+
+def test_hud_feature_extractor_rejects_unknown_measure():
+    with pytest.raises(ValueError):
+        HudFeatureExtractor([FEATURES[0]._replace(measure="rows")])
@@ -0,0 +1,32 @@
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ("cv2", "numpy", "pytesseract", "game_control")
+
+
+def _imported_modules(statement):
+    code = "import json, sys\n{}\nprint(json.dumps(sorted(sys.modules)))".format(
+        statement
+    )
+    output = subprocess.check_output([sys.executable, "-c", code])
+    return set(json.loads(output.decode().splitlines()[-1]))
+
+
+def test_import_does_not_load_heavy_dependencies():
+    # Only what gym itself imports (some gym versions import cv2) is allowed
+    gym_modules = _imported_modules("import gym.envs.registration")
+    package_modules = _imported_modules("import brawl_stars_gym")
+
+    added = package_modules - gym_modules
+    assert not [m for m in added if m.split(".")[0] in HEAVY_MODULES]
+    assert not [m for m in added if m.startswith("brawl_stars_gym.")]
+
+
+def test_registered_entry_points_are_lazy():
+    import gym
+
+    import brawl_stars_gym  # noqa: F401
+
+    for env_id in ("BrawlStarsTryBrawler-v0", "BrawlStarsShowdownSolo-v0"):
+        assert gym.spec(env_id).entry_point.startswith("brawl_stars_gym.envs:")
@@ -0,0 +1,53 @@
+import pytest
+
+from brawl_stars_gym.navigation import NavigationStep, Navigator
+from tests.fixtures import FakeMenuGame
+
+SCRIPT = (
+    NavigationStep("BUTTON_EXIT", True, 0.0),
+    NavigationStep("BUTTON_TRY", False, 1.0),
+)
+
+
+def _events(game):
+    return [event for event, _ in game.events]
+
+
+def test_navigator_clicks_at_once():
+    game = FakeMenuGame({"BUTTON_EXIT": 0.0, "BUTTON_TRY": 0.05})
+    Navigator(game).run("reset", SCRIPT)
+
+    assert _events(game)[:2] == ["grab", "click"]
+
+
+def test_navigator_settles_before_clicking():
+    game = FakeMenuGame({"BUTTON_EXIT": 0.0, "BUTTON_TRY": 0.05})
+    Navigator(game, click_ahead=False, settle=0.05).run("reset", SCRIPT)
+
+    (_, seen_at), (_, settled_at), (event, clicked_at) = game.events[:3]
+    assert event == "click"
+    assert settled_at - seen_at >= 0.05
+    assert clicked_at >= settled_at
+
+
+def test_navigator_learns_latencies():
+    game = FakeMenuGame({"BUTTON_EXIT": 0.0, "BUTTON_TRY": 0.2})
+    navigator = Navigator(game)
+
+    navigator.run("reset", SCRIPT)
+    latency = navigator.latencies[("reset", 1)]
+    assert 0.2 <= latency < 0.2 + 2 * Navigator.MAX_POLL_INTERVAL
+
+    game.events = []
+    navigator.run("reset", SCRIPT)
+    (_, clicked_at), (_, polled_at) = game.events[1:3]
+    # No polling before the transition can have happened
+    assert polled_at - clicked_at >= Navigator.POLL_START * latency
+    assert navigator.last_duration < 0.2 + 2 * Navigator.MAX_POLL_INTERVAL
+
+
+def test_navigator_timeout():
+    game = FakeMenuGame({"BUTTON_EXIT": 0.0, "BUTTON_TRY": 60})
+
+    with pytest.raises(RuntimeError):
+        Navigator(game, timeout=0.1).run("reset", SCRIPT)
@@ -0,0 +1,61 @@
+import cv2
+import numpy as np
+import pytest
+
+from brawl_stars_gym.observation import ObservationBuffer
+
+
+def _roi(value):
+    return np.full((6, 8, 3), value, dtype=np.uint8)
+
+
+@pytest.mark.parametrize(
+    "layout, expected_shape", [("HWC", (4, 6, 8, 1)), ("CHW", (4, 6, 8))]
+)
+def test_observation_buffer_stack(layout, expected_shape):
+    buffer = ObservationBuffer(8, 6, size=5, layout=layout, grayscale=True, stack=4)
+    assert buffer.shape == expected_shape
+    assert buffer.nbytes == (5 + 4 - 1) * 6 * 8
+
+    for step in range(1, 12):
+        stack = buffer.write(_roi(step))
+        assert stack.shape == expected_shape
+        assert np.shares_memory(stack, buffer._slots)
+        assert stack.reshape(4, -1)[:, 0].tolist() == [
+            max(1, step - 3 + i) for i in range(4)
+        ]
+        # Skipped frames are not stacked
+        assert buffer.write(_roi(0), skipped=True) is None
+
+    buffer.clear()
+    assert buffer.write(_roi(20)).reshape(4, -1)[:, 0].tolist() == [20] * 4
+
+
+def test_observation_buffer_downscale():
+    roi = np.random.default_rng(0).integers(0, 256, (12, 16, 3), dtype=np.uint8)
+    expected = cv2.resize(roi, (8, 6), interpolation=cv2.INTER_AREA)
+
+    observation = ObservationBuffer(8, 6).write(roi)
+    assert observation.shape == (6, 8, 3)
+    assert np.array_equal(observation, expected)
+
+    observation = ObservationBuffer(8, 6, grayscale=True).write(roi)
+    assert observation.shape == (6, 8, 1)
+    assert np.array_equal(
+        observation[..., 0], cv2.cvtColor(expected, cv2.COLOR_BGR2GRAY)
+    )
+
+
+def test_observation_buffer_max_pool():
+    buffer = ObservationBuffer(8, 6, max_pool=True)
+    first = np.zeros((6, 8, 3), dtype=np.uint8)
+    first[:, :4] = 200
+    second = np.full((6, 8, 3), 50, dtype=np.uint8)
+
+    assert buffer.write(first, skipped=True) is None
+    observation = buffer.write(second)
+    assert observation[:, :4].max() == observation[:, :4].min() == 200
+    assert observation[:, 4:].max() == observation[:, 4:].min() == 50
+
+    buffer.clear()
+    assert np.array_equal(buffer.write(second), second)
@@ -0,0 +1,38 @@
+import csv
+import json
+
+import pytest
+
+from brawl_stars_gym.profiler import StepProfiler
+
+
+def _profile_steps(profiler, durations):
+    for duration in durations:
+        profiler.add("capture", duration)
+        profiler.add("capture", duration)
+        assert profiler.end_step() == {"capture": 2 * duration}
+
+
+def test_step_profiler_rolling_percentiles():
+    profiler = StepProfiler(window=100)
+    _profile_steps(profiler, [1.0] * 100 + [0.5 * i for i in range(1, 101)])
+
+    stats = profiler.stats()["capture"]
+    assert stats["count"] == 100
+    assert stats["p50"] == pytest.approx(50.5)
+    assert stats["p99"] == pytest.approx(99.01)
+
+
+@pytest.mark.parametrize("filename", ["stats.csv", "stats.json"])
+def test_step_profiler_dump(tmp_path, filename):
+    filepath = tmp_path / filename
+    profiler = StepProfiler(dump_filepath=filepath, dump_interval=0)
+    _profile_steps(profiler, [0.1, 0.2])
+
+    with filepath.open() as f:
+        if filepath.suffix == ".json":
+            dumps = [json.loads(line) for line in f]
+            assert dumps[-1]["stats"]["capture"]["count"] == 2
+        else:
+            rows = list(csv.DictReader(f))
+            assert [row["count"] for row in rows] == ["1", "2"]
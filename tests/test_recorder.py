@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from brawl_stars_gym.recorder import EpisodeRecorder
+
+
+def test_episode_recorder_round_trip(tmp_path):
+    recorder = EpisodeRecorder(tmp_path, chunk_size=2)
+    for step in range(3):
+        observation = np.full((4, 4, 3), step, np.uint8)
+        recorder.record(observation, step, 1.0, step == 2, {"missed_frames": step})
+    recorder.close()
+
+    episode = EpisodeRecorder.load_episode(tmp_path / "episode_00000")
+    assert episode["observations"][:, 0, 0, 0].tolist() == [0, 1, 2]
+    assert episode["info_missed_frames"].tolist() == [0, 1, 2]
+
+
+def test_episode_recorder_raises_writer_error(tmp_path):
+    directory = tmp_path / "file"
+    directory.write_text("not a directory")
+    recorder = EpisodeRecorder(directory, chunk_size=1, max_pending_chunks=1)
+
+    with pytest.raises(OSError):
+        # The writer fails on the first shard; recording must not block
+        for _ in range(10):
+            recorder.record(np.zeros((4, 4, 3), np.uint8), 0, 0.0, False, {})
+        recorder.close()
+
+
+def test_episode_recorder_rejects_dict_observations(tmp_path):
+    recorder = EpisodeRecorder(tmp_path)
+
+    with pytest.raises(ValueError):
+        recorder.record({"pixels": np.zeros((4, 4, 3), np.uint8)}, 0, 0.0, False, {})
+    recorder.close()
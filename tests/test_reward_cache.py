@@ -0,0 +1,36 @@
+import numpy as np
+
+from brawl_stars_gym.reward_cache import RewardCache
+
+
+def _roi(text_columns):
+    roi = np.zeros((22, 52, 3), dtype=np.uint8)
+    roi[5:15, text_columns] = (255, 136, 136)
+    return roi
+
+
+def test_reward_cache_hits_on_unchanged_text():
+    cache = RewardCache(maxsize=2)
+    reads = []
+
+    def read(roi):
+        reads.append(roi)
+        return len(reads)
+
+    roi = _roi(slice(2, 6))
+    other_background = roi.copy()
+    other_background[0] = 40
+
+    assert cache.get(roi, read) == 1
+    assert cache.get(other_background, read) == 1
+    assert cache.get(_roi(slice(8, 12)), read) == 2
+    assert cache.info() == {"hits": 1, "misses": 2, "hit_rate": 1 / 3, "size": 2}
+
+
+def test_reward_cache_drops_least_recently_used():
+    cache = RewardCache(maxsize=1)
+    cache.get(_roi(slice(2, 6)), lambda roi: 1)
+    cache.get(_roi(slice(8, 12)), lambda roi: 2)
+
+    assert cache.get(_roi(slice(2, 6)), lambda roi: 3) == 3
+    assert cache.misses == 3
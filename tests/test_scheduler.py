@@ -0,0 +1,65 @@
+import pytest
+
+from brawl_stars_gym.scheduler import StepScheduler
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def _run(scheduler, clock, steps, step_duration, between_steps=0.0):
+    for _ in range(steps):
+        clock.now += between_steps
+        scheduler.start()
+        clock.now += step_duration
+        scheduler.stop_and_delay()
+
+
+def test_step_scheduler_compensates_drift():
+    clock = _Clock()
+    scheduler = StepScheduler(fps=10, clock=clock, sleep=clock.sleep)
+
+    # Time between steps (like choosing the action) is absorbed by the pause
+    _run(scheduler, clock, 100, step_duration=0.03, between_steps=0.02)
+
+    # The schedule starts at the first step; later steps start late by the time
+    # between steps, which does not accumulate
+    assert clock.now == pytest.approx(0.02 + 10.0)
+    assert scheduler.jitter == pytest.approx(0.02)
+
+
+def test_step_scheduler_skips_missed_steps():
+    clock = _Clock()
+    scheduler = StepScheduler(fps=10, clock=clock, sleep=clock.sleep)
+
+    _run(scheduler, clock, 1, step_duration=0.5)
+    _run(scheduler, clock, 1, step_duration=0.05)
+
+    # The schedule restarts after the overrun, which still counts as lateness
+    assert scheduler.jitter == pytest.approx(0.5 - 0.1)
+    assert clock.now == pytest.approx(0.6)
+
+
+@pytest.mark.parametrize("fps", [2, 30, 100])
+def test_step_scheduler_auto_fps(fps):
+    clock = _Clock()
+    scheduler = StepScheduler(
+        fps=fps, auto=True, max_fps=100, window=20, clock=clock, sleep=clock.sleep
+    )
+
+    _run(scheduler, clock, 2000, step_duration=0.04)
+
+    # Steps of 40 ms sustain 25 steps per second, whether it starts below or above
+    assert 25 * StepScheduler.DECREASE <= scheduler.fps <= 25 * (1 + 1e-9)
+
+
+def test_step_scheduler_auto_fps_needs_initial_fps():
+    with pytest.raises(ValueError):
+        StepScheduler(fps=(2, 5), auto=True)
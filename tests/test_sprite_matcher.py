@@ -0,0 +1,74 @@
+import cv2
+import numpy as np
+from game_control.sprite import Sprite
+
+from brawl_stars_gym.sprite_matcher import SpriteMatcher
+
+# (top, left) per sprite in the frame; sizes are (height, width)
+LOCATIONS = {"SPRITE_MATCHER_A": (40, 600), "SPRITE_MATCHER_B": (300, 120)}
+SIZES = {
+    "SPRITE_MATCHER_A": (48, 64),
+    "SPRITE_MATCHER_B": (40, 160),
+    "SPRITE_MATCHER_ABSENT": (48, 48),
+}
+
+
+def _texture(shape, seed):
+    rng = np.random.default_rng(seed)
+    img = rng.integers(0, 256, shape, dtype=np.uint8)
+    # Smooth, so the texture survives the pyramid levels of the coarse search
+    return cv2.GaussianBlur(img, (0, 0), 3)
+
+
+def _scene():
+    frame = _texture((540, 960, 3), 0)
+    sprites = {}
+    for seed, (name, (height, width)) in enumerate(SIZES.items(), 1):
+        img = _texture((height, width, 3), seed)
+        if name in LOCATIONS:
+            top, left = LOCATIONS[name]
+            frame[top : top + height, left : left + width] = img
+        sprites[name] = Sprite(name, image_data=img[..., np.newaxis])
+    return frame, sprites
+
+
+def _expected(name):
+    top, left = LOCATIONS[name]
+    height, width = SIZES[name]
+    return (top, left, top + height, left + width)
+
+
+def test_locate_coarse_to_fine_matches_full_resolution():
+    frame, sprites = _scene()
+    full_resolution = SpriteMatcher(levels=0)
+
+    for name in LOCATIONS:
+        location = SpriteMatcher().locate(frame, sprites[name])
+        assert location == _expected(name)
+        assert location == full_resolution.locate(frame, sprites[name])
+
+
+def test_locate_all():
+    frame, sprites = _scene()
+    top, left, bottom, right = _expected("SPRITE_MATCHER_B")
+    targets = [
+        (sprites["SPRITE_MATCHER_A"], None),
+        (sprites["SPRITE_MATCHER_ABSENT"], None),
+        (sprites["SPRITE_MATCHER_B"], (top - 10, left - 10, bottom + 10, right + 10)),
+        (sprites["SPRITE_MATCHER_B"], (0, 0, 200, 300)),
+    ]
+
+    assert SpriteMatcher().locate_all(frame, targets) == [
+        _expected("SPRITE_MATCHER_A"),
+        None,
+        _expected("SPRITE_MATCHER_B"),
+        None,
+    ]
+
+
+def test_locate_template_larger_than_region():
+    frame, sprites = _scene()
+    top, left, _, _ = _expected("SPRITE_MATCHER_A")
+
+    region = (top, left, top + 20, left + 20)
+    assert SpriteMatcher().locate(frame, sprites["SPRITE_MATCHER_A"], region) is None
@@ -0,0 +1,51 @@
+import os
+
+import cv2
+import numpy as np
+
+from brawl_stars_gym.sprite_registry import SpriteRegistry
+
+
+def _write_sprite(directory, name):
+    directory.mkdir(parents=True, exist_ok=True)
+    img = np.zeros((8, 8, 4), dtype=np.uint8)
+    cv2.imwrite(str(directory / "sprite_{}_0.png".format(name)), img)
+
+
+def test_sprite_registry_discovers_once(tmp_path):
+    sprite_dir = tmp_path / "sprites"
+    _write_sprite(sprite_dir, "button")
+    registry = SpriteRegistry(tmp_path / "sprites.npz")
+
+    sprites = registry.discover(sprite_dir)
+    sprites.clear()
+    again = registry.discover(sprite_dir)
+    assert list(again) == ["SPRITE_BUTTON"]
+    assert again["SPRITE_BUTTON"] is registry.discover(sprite_dir)["SPRITE_BUTTON"]
+
+    calls = []
+    for _ in range(2):
+        registry.derived(again["SPRITE_BUTTON"], "gray", calls.append)
+    assert len(calls) == 1
+
+
+def test_sprite_registry_packed(tmp_path):
+    sprite_dir = tmp_path / "sprites"
+    _write_sprite(sprite_dir, "button")
+    packed_filepath = tmp_path / "sprites.npz"
+    SpriteRegistry(packed_filepath).pack([sprite_dir])
+
+    sprites = SpriteRegistry(packed_filepath).discover(sprite_dir)
+    assert list(sprites) == ["SPRITE_BUTTON"]
+    assert np.asarray(sprites["SPRITE_BUTTON"].image_data).ndim == 4
+
+    # Sprites newer than the packed file are discovered again
+    png = next(sprite_dir.glob("*.png"))
+    mtime = packed_filepath.stat().st_mtime + 10
+    os.utime(str(png), (mtime, mtime))
+    _write_sprite(sprite_dir, "other")
+    os.utime(str(next(sprite_dir.glob("sprite_other_*.png"))), (mtime, mtime))
+    assert sorted(SpriteRegistry(packed_filepath).discover(sprite_dir)) == [
+        "SPRITE_BUTTON",
+        "SPRITE_OTHER",
+    ]
@@ -0,0 +1,62 @@
+import sys
+
+import numpy as np
+import pytest
+
+from brawl_stars_gym.subproc_vector_env import BrawlStarsSubprocVectorEnv
+from brawl_stars_gym.synthetic import SyntheticRecording
+from tests.fixtures import TimestampRewardTryBrawler
+
+pytestmark = pytest.mark.skipif(
+    sys.version_info < (3, 8) or sys.platform == "win32",
+    reason="Needs shared_memory and the fork start method",
+)
+
+
+def _instance_kwargs(**kwargs):
+    return dict(recording=SyntheticRecording(8), fps=1000, **kwargs)
+
+
+def test_subproc_vector_env_steps_and_resets():
+    env = BrawlStarsSubprocVectorEnv(
+        [
+            _instance_kwargs(episode_duration_in_seconds=0, reset_duration=0.5),
+            _instance_kwargs(),
+        ],
+        game_class=TimestampRewardTryBrawler,
+        timeout=10,
+        context="fork",
+    )
+    try:
+        observations = env.reset()
+        assert observations.shape[0] == 2
+
+        _, rewards, dones, infos = env.step([env.actions[0]] * 2)
+        assert dones.tolist() == [True, False]
+        assert [info["ready"] for info in infos] == [True, True]
+        assert np.all(rewards > 0)
+
+        # The first instance is resetting, so only the second one steps
+        _, rewards, dones, infos = env.step([env.actions[0]] * 2)
+        assert [info["ready"] for info in infos] == [False, True]
+        assert rewards[0] == 0
+        assert env.reset_wait(timeout=5) == []
+    finally:
+        env.close()
+
+
+def test_subproc_vector_env_reset_timeout():
+    env = BrawlStarsSubprocVectorEnv(
+        [_instance_kwargs(), _instance_kwargs(reset_duration=60)],
+        game_class=TimestampRewardTryBrawler,
+        timeout=0.5,
+        context="fork",
+    )
+    env.CLOSE_TIMEOUT = 0.5
+    try:
+        with pytest.raises(RuntimeError):
+            env.reset()
+        assert env.reset_wait(timeout=0) == [1]
+    finally:
+        env.close()
+    assert not any(process.is_alive() for process in env._processes)
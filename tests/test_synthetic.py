@@ -0,0 +1,43 @@
+import numpy as np
+
+from brawl_stars_gym.digits import DigitReader
+from brawl_stars_gym.replay import Recording
+from brawl_stars_gym.synthetic import SyntheticRecording
+from brawl_stars_gym.try_brawler import TryBrawler
+
+REGION = TryBrawler.TRY_BRAWLER_REGIONS["REWARD_TRY_DAMAGE_PER_SECOND"]
+
+
+def _text_pixels(frame):
+    top, left, bottom, right = REGION
+    roi = frame[top:bottom, left:right]
+    return np.all(roi == DigitReader.TEXT_COLOR_BGR, axis=2).sum()
+
+
+def test_synthetic_recording_is_deterministic():
+    recording = SyntheticRecording(8, seed=3)
+    other = SyntheticRecording(8, seed=3)
+
+    assert np.array_equal(recording.damage, other.damage)
+    for index in range(len(recording)):
+        assert np.array_equal(recording.frames[index], other.frames[index])
+
+
+def test_synthetic_recording_renders_damage():
+    recording = SyntheticRecording(32, zero_fraction=0.5)
+
+    assert 0 in recording.damage
+    for frame, damage in recording:
+        assert frame.shape == (540, 960, 3)
+        assert (_text_pixels(frame) > 0) == (damage > 0)
+
+
+def test_synthetic_recording_save(tmp_path):
+    recording = SyntheticRecording(5, fps=10)
+    recording.save(tmp_path, chunk_size=2)
+
+    saved = Recording(tmp_path)
+    assert np.array_equal(saved.timestamps, recording.timestamps)
+    assert np.array_equal(np.load(str(tmp_path / "damage.npy")), recording.damage)
+    for index in range(len(recording)):
+        assert np.array_equal(saved.frames[index], recording.frames[index])
@@ -0,0 +1,50 @@
+import cv2
+import numpy as np
+
+from brawl_stars_gym.text_preprocessor import TextImagePreprocessor
+
+
+def _text_roi(text):
+    roi = np.full((22, 52, 3), 40, dtype=np.uint8)
+    mask = np.zeros(roi.shape[:2], dtype=np.uint8)
+    cv2.putText(mask, text, (2, 18), cv2.FONT_HERSHEY_SIMPLEX, 0.55, 255, 2)
+    roi[mask > 0] = (255, 136, 136)
+    return roi
+
+
+def _reference(img):
+    # The preprocessing of the first version, with fresh arrays
+    img = cv2.resize(img, (0, 0), fx=5, fy=5)
+    img = cv2.inRange(img, np.array([240, 121, 121]), np.array([270, 151, 151]))
+    img = cv2.bitwise_not(img)
+    return cv2.blur(img, (2, 2))
+
+
+def test_text_image_preprocessor_matches_reference():
+    for text in ("0", "345", "1104", "2727"):
+        roi = _text_roi(text)
+        preprocessed = TextImagePreprocessor.for_shape(roi.shape, mask_first=False)(roi)
+
+        assert preprocessed.shape == (110, 260)
+        assert np.array_equal(preprocessed, _reference(roi))
+
+
+def test_text_image_preprocessor_mask_first():
+    for text in ("0", "345", "1104", "2727"):
+        roi = cv2.GaussianBlur(_text_roi(text), (3, 3), 0)
+        reference = _reference(roi)
+        preprocessed = TextImagePreprocessor.for_shape(roi.shape)(roi)
+
+        # Only pixels along text edges (within a pixel of roi) may differ
+        text = (reference < 128).astype(np.uint8)
+        edges = cv2.morphologyEx(text, cv2.MORPH_GRADIENT, np.ones((11, 11), np.uint8))
+        assert preprocessed.shape == (110, 260)
+        assert not np.any((preprocessed != reference) & (edges == 0))
+
+
+def test_text_image_preprocessor_reuses_buffers():
+    roi = _text_roi("345")
+    preprocessor = TextImagePreprocessor.for_shape(roi.shape)
+
+    assert TextImagePreprocessor.for_shape(roi.shape) is preprocessor
+    assert preprocessor(roi) is preprocessor(_text_roi("790"))
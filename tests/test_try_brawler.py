@@ -1,54 +1,186 @@
-from pathlib import Path
-
-import cv2
+import numpy as np
 import pytest
 
+from brawl_stars_gym.cli import main
+from brawl_stars_gym.digits import DigitReader
+from brawl_stars_gym.recorder import EpisodeRecorder
+from brawl_stars_gym.replay import Recording, replay
+from brawl_stars_gym.synthetic import SyntheticRecording
 from brawl_stars_gym.try_brawler import TryBrawler
+from tests.fixtures import (
+    DAMAGE_PER_SECOND_CASES,
+    DIGIT_TEMPLATE_CASES,
+    HELD_OUT_CASES,
+    TimestampRewardTryBrawler,
+    damage_per_second_samples,
+    read_image,
+)
 
 
 @pytest.mark.parametrize(
-    "image_filename, expected_damage_per_second",
-    [
-        ("region_1615323288.933967.png", 1104),
-        ("region_1615323287.451309.png", 1104),
-        ("region_1615323285.9551656.png", 690),
-        ("region_1615323282.927077.png", 345),
-        ("region_1615323281.4278924.png", 0),
-        ("region_1615323279.9353352.png", 0),
-        ("region_1615323278.4275265.png", 0),
-        ("region_1615323276.8998601.png", 0),
-        ("region_1615323275.4353292.png", 345),
-        ("region_1615323273.9144456.png", 345),
-        ("region_1615323272.4369917.png", 0),
-        ("region_1615323270.9134169.png", 1188),
-        ("region_1615323269.429769.png", 1215),
-        ("region_1615323267.9092262.png", 1564),
-        ("region_1615323266.4272156.png", 2415),
-        ("region_1615323264.9300942.png", 345),
-        ("region_1615323263.4112701.png", 790),
-        ("region_1615323261.890822.png", 1473),
-        ("region_1615323260.4179654.png", 2176),
-        ("region_1615323258.9119284.png", 1847),
-        ("region_1615323257.4330688.png", 2727),
-        ("region_1615323255.900718.png", 2008),
-        ("region_1615323254.388059.png", 2321),
-        ("region_1615323252.9088092.png", 1571),
-        ("region_1615323251.4210038.png", 803),
-        ("region_1615323249.912249.png", 948),
-        ("region_1615323248.3961856.png", 1436),
-        ("region_1615323246.9156165.png", 1573),
-        ("region_1615323245.4008174.png", 995),
-        ("region_1615323243.9200182.png", 1327),
-        ("region_1615323242.4288852.png", 854),
-        ("region_1615323240.921151.png", 1405),
-        ("region_1615323239.4166396.png", 1533),
-        ("region_1615323237.9028618.png", 1035),
-        ("region_1615323236.4090006.png", 0),
-        ("region_1615323234.914815.png", 0),
-    ],
+    "image_filename, expected_damage_per_second", DAMAGE_PER_SECOND_CASES
 )
 def test_damage_per_second(image_filename, expected_damage_per_second):
-    image_filepath = Path(__file__).parent / "data" / image_filename
-    image = cv2.imread(str(image_filepath))
+    image = read_image(image_filename)
 
     assert TryBrawler.damage_per_second(image) == expected_damage_per_second
+
+
+def test_damage_per_second_batch():
+    images = [
+        read_image(image_filename) for image_filename, _ in DAMAGE_PER_SECOND_CASES
+    ]
+
+    assert TryBrawler.damage_per_second_batch(images, backend="tesseract") == [
+        expected for _, expected in DAMAGE_PER_SECOND_CASES
+    ]
+
+
+def test_digit_reader_from_samples():
+    reader = DigitReader.from_samples(damage_per_second_samples(DIGIT_TEMPLATE_CASES))
+    held_out = damage_per_second_samples(HELD_OUT_CASES)
+
+    assert [reader.read(roi) for roi, _ in held_out] == [e for _, e in held_out]
+
+
+@pytest.mark.skipif(
+    not DigitReader.has_default(), reason="Digit templates missing; run make digits"
+)
+def test_bundled_digit_reader():
+    reader = DigitReader.default()
+    held_out = damage_per_second_samples(HELD_OUT_CASES)
+
+    assert [reader.read(roi) for roi, _ in held_out] == [e for _, e in held_out]
+
+
+def _save_recording(directory):
+    frames = np.zeros((len(DAMAGE_PER_SECOND_CASES), 540, 960, 3), dtype=np.uint8)
+    for frame, (image_filename, _) in zip(frames, DAMAGE_PER_SECOND_CASES):
+        frame[67:89, 848:900] = read_image(image_filename)
+    Recording.save(directory, frames, np.arange(len(frames)))
+    return frames
+
+
+def test_replay_try_brawler(tmp_path):
+    frames = _save_recording(tmp_path)
+
+    game = replay(TryBrawler)(recording=tmp_path, fps=1000)
+    game.reset()
+    for _ in range(len(frames)):
+        _, reward, _, info = game.step(game.actions[0])
+        index = int(info["next_observation_timestamp"])
+        assert reward == DAMAGE_PER_SECOND_CASES[index][1]
+
+
+def test_replay_try_brawler_held_keys():
+    game = TimestampRewardTryBrawler(
+        recording=SyntheticRecording(8), fps=1000, held_keys=True, frame_skip=2
+    )
+    game.reset()
+    for action in [(1, 1), (1, 1), (0, 0)]:
+        game.step(action)
+
+    assert game.input_controller.handled_keys == 0
+    assert game.input_controller.pressed_keys == 2
+    assert game.input_controller.released_keys == 2
+
+
+def test_replay_try_brawler_async_reward():
+    game = TimestampRewardTryBrawler(
+        recording=SyntheticRecording(8),
+        fps=1000,
+        async_reward=True,
+        reward_duration=0.02,
+    )
+    game.reset()
+    previous_timestamp = None
+    for _ in range(4):
+        _, reward, _, info = game.step(game.actions[0])
+        # The reward of the frame of the previous step; 0 on the first step
+        assert info["reward_timestamp"] == previous_timestamp
+        assert reward == (0 if previous_timestamp is None else previous_timestamp)
+        assert info["dropped_rewards"] == 0
+        previous_timestamp = info["next_observation_timestamp"]
+    game.close()
+
+
+def test_replay_try_brawler_reward_deadline():
+    game = TimestampRewardTryBrawler(
+        recording=SyntheticRecording(8),
+        fps=1000,
+        reward_deadline=0.3,
+        reward_duration=0.4,
+        async_reward=True,
+    )
+    game.reset()
+    action = game.actions[0]
+
+    _, reward, _, info = game.step(action)
+    assert (reward, info["reward_timestamp"]) == (0, None)
+
+    # Ready within the deadline, so it supersedes the reward of the first step
+    game.reward_duration = 0.0
+    for dropped_rewards in (1, 0):
+        _, reward, _, info = game.step(action)
+        assert reward == info["reward_timestamp"] == info["next_observation_timestamp"]
+        assert info["dropped_rewards"] == dropped_rewards
+    game.close()
+
+
+def test_replay_try_brawler_downscaled_max_pooled(tmp_path):
+    # Uniform frames that get darker, so max pooling keeps the skipped frame
+    values = np.arange(200, 40, -20)
+    frames = np.zeros((len(values), 540, 960, 3), dtype=np.uint8)
+    frames[:] = values[:, np.newaxis, np.newaxis, np.newaxis]
+    Recording.save(tmp_path, frames, np.arange(len(frames)))
+
+    game = TimestampRewardTryBrawler(
+        recording=tmp_path,
+        fps=1000,
+        observation_resolution=(84, 64),
+        observation_max_pool=True,
+        frame_skip=2,
+    )
+    observation = game.reset()
+    assert observation.shape == (64, 84, 3)
+    assert game.observation_space.contains(observation)
+    for _ in range(6):
+        observation, _, _, info = game.step(game.actions[0])
+        index = int(info["next_observation_timestamp"])
+        expected = max(values[index - 1], values[index])
+
+        assert game.observation_space.contains(observation)
+        assert observation.min() == observation.max() == expected
+
+
+def test_default_reward_backend():
+    recording = SyntheticRecording(2)
+    reader = DigitReader({digit: np.eye(14, 10) for digit in range(10)})
+    expected = "template" if DigitReader.has_default() else "tesseract"
+
+    game = TimestampRewardTryBrawler(recording=recording, fps=1000)
+    assert game._reward_backend == expected
+    game = TimestampRewardTryBrawler(recording=recording, fps=1000, digit_reader=reader)
+    assert game._reward_backend == "template"
+
+
+def test_relabel(tmp_path):
+    _save_recording(tmp_path / "recording")
+
+    assert main(["relabel", str(tmp_path), "--workers", "2", "--chunk-size", "8"]) == 0
+    assert np.load(str(tmp_path / "recording" / "rewards.npy")).tolist() == [
+        expected for _, expected in DAMAGE_PER_SECOND_CASES
+    ]
+
+
+def test_recorder_rejects_dict_observations(tmp_path):
+    recorder = EpisodeRecorder(tmp_path)
+
+    with pytest.raises(ValueError):
+        TimestampRewardTryBrawler(
+            recording=SyntheticRecording(2),
+            fps=1000,
+            observation_hud="dict",
+            recorder=recorder,
+        )
+    recorder.close()
@@ -0,0 +1,55 @@
+import time
+
+from brawl_stars_gym.synthetic import SyntheticRecording
+from brawl_stars_gym.vector_env import BrawlStarsVectorEnv
+from tests.fixtures import TimestampRewardTryBrawler
+
+
+def _instance_kwargs(**kwargs):
+    return dict(recording=SyntheticRecording(8), fps=1000, **kwargs)
+
+
+def test_vector_env_steps_and_resets():
+    env = BrawlStarsVectorEnv(
+        [
+            _instance_kwargs(episode_duration_in_seconds=0, reset_duration=0.5),
+            _instance_kwargs(),
+        ],
+        game_class=TimestampRewardTryBrawler,
+    )
+    try:
+        space = env.games[0].observation_space
+        observations = env.reset()
+        assert observations.shape == (2,) + space.shape
+        assert observations.dtype == space.dtype
+
+        _, rewards, dones, infos = env.step([env.actions[0]] * 2)
+        assert dones.tolist() == [True, False]
+        assert [info["ready"] for info in infos] == [True, True]
+        # Rewards are determined on the shared pool, so they are asynchronous
+        assert rewards.tolist() == [info["reward_timestamp"] or 0 for info in infos]
+        assert all(space.contains(observation) for observation in observations)
+
+        # The first instance is resetting, so only the second one steps
+        _, rewards, dones, infos = env.step([env.actions[0]] * 2)
+        assert [info["ready"] for info in infos] == [False, True]
+        assert rewards[0] == 0
+        assert env.reset_wait() == []
+
+        _, _, _, infos = env.step([env.actions[0]] * 2)
+        assert [info["ready"] for info in infos] == [True, True]
+    finally:
+        env.close()
+
+
+def test_vector_env_close_does_not_wait_for_resets():
+    env = BrawlStarsVectorEnv(
+        [_instance_kwargs(), _instance_kwargs(reset_duration=2)],
+        game_class=TimestampRewardTryBrawler,
+    )
+    env.reset_async(range(2))
+    assert env.reset_wait(timeout=0.5) == [1]
+
+    started_at = time.monotonic()
+    env.close()
+    assert time.monotonic() - started_at < 1